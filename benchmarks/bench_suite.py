@@ -0,0 +1,111 @@
+# benchmarks/bench_suite.py - parse / generate / naming / folder listing / memory, comparable across versions
+#
+#   python benchmarks/bench_suite.py [--versions 0.7 0.7.1 0.7.1JP 0.8 0.8-mmap] [--scenarios 200] [--profiles 4]
+#                                    [--weapons 2] [--lines 60] [--variants 8] [--json results.json]
+#
+# Builds a synthetic corpus (benchmarks/corpus.py) in a temp folder and times each version's own functions on it.
+# The V0.7.x scripts are imported straight from their files (tkinter has to be importable, no window is opened);
+# V0.8 is measured through variant_core, which is what its GUI and CLI call; "0.8-mmap" is the same with the
+# memory-mapped scanner and splicing writer (`--reader mmap`).
+# All four versions now import parse/create/naming from variant_core, so those columns only differ across checkouts;
+# run the suite from an older commit with the same corpus options to compare against the pre-unification engines.
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT); sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import write_corpus
+
+VERSION_SCRIPTS = {"0.7": "iyo_Variant_GeneratorV0.7.py", "0.7.1": "iyo_Scenario_Variant_GeneratorV0.7.1.py", "0.7.1JP": "iyo_Scenario_Variant_GeneratorV0.7.1JP.py"}
+VARIANT_VALUES = [("SIZE", 50), ("SPEED", 80), ("TIMESCALE", 120), ("DURATION", 30), ("HP", 150), ("REGEN_RATE", 50), ("SIZE", 120), ("SPEED", 120)]
+SEARCH_QUERY = "thetic 001"
+CORE_VERSIONS = ["0.8", "0.8-mmap"]
+
+def load_version(version):
+    # Returns (parse, create, get_base_name, modifier_config, list_folder) for one version
+    if version in CORE_VERSIONS:
+        import variant_core
+        index = {"version": 1, "folders": {}} # in memory, so the user's scenario_index.json is never touched
+        def list_folder(folder, query):
+            names = sorted(variant_core.refresh_folder_index(index, folder), key=str.lower)
+            return variant_core.ScenarioSearch(names).search(query, limit=None)
+        if version == "0.8-mmap":
+            def create_spliced(base_data, folder_path, variant_type_key, new_value, variant_configs):
+                return variant_core.generate_spliced_variant(base_data, folder_path, [(variant_type_key, new_value)], variant_configs)[0]
+            return variant_core.scan_scenario_file, create_spliced, variant_core.get_base_scenario_name, variant_core.MODIFIER_CONFIG, list_folder
+        return variant_core.parse_scenario_file, variant_core.create_variant_file, variant_core.get_base_scenario_name, variant_core.MODIFIER_CONFIG, list_folder
+    spec = importlib.util.spec_from_file_location(f"variant_generator_{version.replace('.', '_')}", os.path.join(ROOT, VERSION_SCRIPTS[version]))
+    module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module)
+    def list_folder(folder, query):
+        # The scan + filter of VariantGeneratorApp._populate_scenario_list / _update_filtered_list, minus the Listbox
+        names = sorted((filename[:-4] for filename in os.listdir(folder) if filename.lower().endswith(".sce")), key=str.lower)
+        return [name for name in names if not query or query.lower() in name.lower()]
+    return module.parse_scenario_file, module.create_variant_file, module.get_base_scenario_name, module.MODIFIER_CONFIG, list_folder
+def percentile(times, fraction): times = sorted(times); return times[min(len(times) - 1, int(fraction * len(times)))] if times else 0.0
+def bench_version(version, corpus_folder, names, variants):
+    parse, create, get_base_name, modifier_config, list_folder = load_version(version); result = {"version": version}
+    paths = [os.path.join(corpus_folder, name + ".sce") for name in names]
+    # Parse: per file, then (in a second pass, tracemalloc slows everything down) the memory the parsed corpus holds on to
+    parse_times = []; parsed = []
+    for name, path in zip(names, paths):
+        started = time.perf_counter(); base_data = parse(path); parse_times.append(time.perf_counter() - started)
+        base_data["user_provided_name"] = name; parsed.append(base_data)
+    tracemalloc.start(); held = [parse(path) for path in paths]; current, peak = tracemalloc.get_traced_memory(); tracemalloc.stop(); del held
+    result.update(parse_ms_mean=sum(parse_times) / len(parse_times) * 1000, parse_ms_p95=percentile(parse_times, 0.95) * 1000, parsed_mb=current / 1048576, parse_peak_mb=peak / 1048576)
+    # Generate: every variant of every scenario through the version's create_variant_file, into a scratch folder
+    variant_configs = {key: {"values": [], "suffix": config["suffix"], "tag_text": config["tag_text"], "display_name": config["display_name"]} for key, config in modifier_config.items()}
+    out_folder = tempfile.mkdtemp(prefix="bench_out_"); variant_times = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for base_data in parsed:
+                for key, value in VARIANT_VALUES[:variants]:
+                    started = time.perf_counter(); create(base_data, out_folder, key, value, variant_configs); variant_times.append(time.perf_counter() - started)
+    finally: shutil.rmtree(out_folder, ignore_errors=True)
+    result.update(variant_ms_mean=sum(variant_times) / len(variant_times) * 1000, variant_ms_p95=percentile(variant_times, 0.95) * 1000, variants_per_sec=len(variant_times) / sum(variant_times))
+    # Base name of tagged names, as done for every variant
+    tags = [config["tag_text"] for config in modifier_config.values()]; tagged = [f"{name} Size 80% Dur 30s" for name in names]
+    started = time.perf_counter()
+    for repeat in range(20):
+        for name in tagged: get_base_name(name, tags)
+    result["base_name_us"] = (time.perf_counter() - started) / (20 * len(tagged)) * 1e6
+    # Folder listing + search filter: first call (cold) and repeated calls (warm)
+    started = time.perf_counter(); matches = list_folder(corpus_folder, SEARCH_QUERY); cold = time.perf_counter() - started
+    warm_times = []
+    for repeat in range(5): started = time.perf_counter(); list_folder(corpus_folder, SEARCH_QUERY); warm_times.append(time.perf_counter() - started)
+    result.update(list_ms_cold=cold * 1000, list_ms_warm=min(warm_times) * 1000, list_matches=len(matches))
+    return result
+COLUMNS = [("parse_ms_mean", "parse ms"), ("parse_ms_p95", "p95"), ("parsed_mb", "held MB"), ("variant_ms_mean", "variant ms"), ("variant_ms_p95", "p95"),
+           ("variants_per_sec", "variants/s"), ("base_name_us", "name us"), ("list_ms_cold", "list ms"), ("list_ms_warm", "warm")]
+def format_results(results):
+    lines = [f"{'version':10}" + "".join(f"{label:>12}" for key, label in COLUMNS)]
+    for result in results: lines.append(f"{result['version']:10}" + "".join(f"{result[key]:12.3f}" for key, label in COLUMNS))
+    return "\n".join(lines)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scenario parsing, variant generation and folder listing across versions.")
+    parser.add_argument("--versions", nargs="+", default=list(VERSION_SCRIPTS) + CORE_VERSIONS, choices=list(VERSION_SCRIPTS) + CORE_VERSIONS)
+    parser.add_argument("--scenarios", type=int, default=200, help="number of scenarios in the corpus folder")
+    parser.add_argument("--profiles", type=int, default=4, help="[Character Profile] blocks per scenario (one is the player)")
+    parser.add_argument("--weapons", type=int, default=2, help="[Weapon Profile] blocks per scenario")
+    parser.add_argument("--lines", type=int, default=60, help="filler keys per section")
+    parser.add_argument("--variants", type=int, default=len(VARIANT_VALUES), help=f"variants generated per scenario (max {len(VARIANT_VALUES)})")
+    parser.add_argument("--json", help="also write the results (and the corpus parameters) to this JSON file")
+    args = parser.parse_args(argv)
+    corpus_folder = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        names = write_corpus(corpus_folder, args.scenarios, args.profiles, args.weapons, args.lines)
+        print(f"Corpus: {args.scenarios} scenarios, {args.profiles} character / {args.weapons} weapon profiles, {args.lines} filler keys per section")
+        results = [bench_version(version, corpus_folder, names, max(1, min(args.variants, len(VARIANT_VALUES)))) for version in args.versions]
+    finally: shutil.rmtree(corpus_folder, ignore_errors=True)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f: json.dump({"corpus": {key: getattr(args, key) for key in ("scenarios", "profiles", "weapons", "lines", "variants")}, "results": results}, f, indent=2)
+if __name__ == "__main__": main()
@@ -0,0 +1,34 @@
+# benchmarks/corpus.py - synthetic KovaaK's .sce files for benchmarking
+#
+# The files have the shape of real scenarios: global keys (Name, Timelimit, scores, ...) followed by
+# [Character Profile], [Weapon Profile] and [Bot Profile] sections. `lines` filler keys per section stand in
+# for the hundreds of settings a real export carries, so parse / rewrite cost scales like it does in practice.
+
+import os
+import random
+
+def make_scenario_text(name, profiles=4, weapons=2, lines=60, seed=0):
+    rng = random.Random(seed); out = []
+    bots = [f"Bot{i}" for i in range(1, profiles)]
+    out += [f"Name={name}", "GameModeType=Challenge", f"Timelimit={rng.choice([30.0, 45.0, 60.0, 0.0 if seed % 17 == 0 else 60.0])}", "PlayerCharacters=Player.rot",
+            "BotProfileNames=" + ";".join(f"{bot}.bot" for bot in bots), f"Timescale={rng.choice([1.0, 1.0, 0.8, 1.25])}", f"ScorePerHit={rng.choice([0.0, 10.0])}",
+            f"ScorePerDamage={rng.choice([0.0, 1.5])}", f"ScorePerKill={rng.choice([0.0, 100.0])}", f"Description=Synthetic scenario {seed}"]
+    out += [f"GlobalSetting{i}={rng.random() * 100:.3f}" for i in range(lines)]
+    for profile in ["Player"] + bots:
+        out += ["[Character Profile]", f"Name={profile}", f"MaxHealth={rng.choice([100.0, 200.0, 1000.0])}", f"MainBBRadius={rng.uniform(10, 60):.1f}",
+                f"MaxSpeed={rng.uniform(0, 1500):.1f}", f"MaxCrouchSpeed={rng.choice([0.0, rng.uniform(100, 500)]):.1f}", f"HealthRegenPerSec={rng.choice([0.0, 5.0])}"]
+        out += [f"ProfileSetting{i}={rng.random() * 100:.3f}" for i in range(lines)]
+    for weapon in range(weapons):
+        out += ["[Weapon Profile]", f"Name=Weapon{weapon}", f"Damage={rng.uniform(1, 100):.1f}", f"MaxHealth={rng.randint(1, 10)}"]
+        out += [f"WeaponSetting{i}={rng.random() * 100:.3f}" for i in range(lines)]
+    for bot in bots: out += ["[Bot Profile]", f"Name={bot}", f"CharacterProfileName={bot}", "SeeThroughWalls=false"]
+    return "\n".join(out) + "\n"
+def write_corpus(folder, count, profiles=4, weapons=2, lines=60, prefix="Synthetic"):
+    # Writes `count` scenarios and returns their names; the folder's mtime is moved into the past so
+    # V0.8's folder index treats the listing as settled, like a Scenarios folder that isn't being written to
+    os.makedirs(folder, exist_ok=True); names = []
+    for i in range(count):
+        name = f"{prefix} {i:05d}"; names.append(name)
+        with open(os.path.join(folder, name + ".sce"), 'w', encoding='utf-8') as f: f.write(make_scenario_text(name, profiles, weapons, lines, seed=i))
+    past = os.stat(folder).st_mtime - 60; os.utime(folder, (past, past))
+    return names
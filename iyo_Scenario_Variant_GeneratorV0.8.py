@@ -1,13 +1,26 @@
 # iyo_Scenario_Variant_GeneratorV0.8_RC1.py (Version 20.0 - Final Logic & QoL)
 
+import time
+_STARTUP_T0 = time.perf_counter()
+import os
+import json
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from variant_core import (MODIFIER_CONFIG, GENERATION_WORKERS, get_default_profile, save_settings, load_settings,
+                          get_variant_template, generate_combined_variant, iter_variant_tasks, count_variant_tasks, load_scenario_index, save_scenario_index, refresh_folder_index, record_created_scenarios, ScenarioSearch,
+                          ScenarioCache, SCENARIO_CACHE_MAX_MB, resolve_batch_scenarios, iter_batch_results, new_batch_summary, format_batch_summary,
+                          VariantWriter, DEFAULT_FSYNC_POLICY, RunMetrics, format_run_summary, append_run_metrics, scan_conflicts, iter_variant_plan, format_plan_entry, export_plan,
+                          ScenarioCatalog, parse_catalog_query)
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Any command-line arguments mean headless batch mode (see variant_core/cli.py) - Tk is never loaded for it
+    from variant_core.cli import main
+    sys.exit(main())
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.simpledialog import askstring
 from tkinter import font
-import os
-import re
-import json
-import sys
 # Co-developed with Gemini, a large language model from Google.
 
 # --- LANGUAGE DATA ---
@@ -37,11 +50,22 @@ LANGUAGES = {
         "button_edit_values": "Edit Values",
         "button_save_values": "Save Values",
         "button_generate": "Generate Variants",
+        "check_cross_product": "Combine selected (cross-product)",
+        "button_batch": "Batch Generate...",
+        "button_preview": "Preview...",
+        "dialog_plan_title": "Preview (nothing is written)",
+        "dialog_plan_summary": "{variants} variants, {exists} already exist, {failed} can't be created.",
+        "button_export_json": "Export JSON...",
+        "button_export_csv": "Export CSV...",
+        "dialog_batch_title": "Batch Generate",
+        "dialog_batch_prompt": "Scenario names, wildcards (e.g. VT *) or playlist .json files, separated by ';':",
+        "dialog_batch_confirm": "Create {variants} variants from {scenarios} scenarios.\n\nOverwrite files that already exist? (No = skip them)",
+        "error_batch_no_match": "No scenarios matched.",
         "frame_log": "Status Log",
         "button_select_all": "Select All",
         "button_deselect_all": "Deselect All",
         "dialog_overwrite_title": "Overwrite Confirmation",
-        "dialog_overwrite_text": 'The file "{filename}" already exists.\n\nHow would you like to proceed for this and all future conflicts in this batch?',
+        "dialog_overwrite_text": '{count} of the {total} variants already exist.\n\nSelect the files to overwrite; the others will be skipped.',
         "dialog_save_profile_title": "Save Profile As",
         "dialog_save_profile_prompt": "Enter a name for the new profile:",
         "dialog_rename_profile_title": "Rename Profile",
@@ -77,11 +101,22 @@ LANGUAGES = {
         "button_edit_values": "値を編集",
         "button_save_values": "値を保存",
         "button_generate": "派生シナリオを生成",
+        "check_cross_product": "選択を組み合わせる（全組み合わせ）",
+        "button_batch": "一括生成...",
+        "button_preview": "プレビュー...",
+        "dialog_plan_title": "プレビュー（ファイルは書き込まれません）",
+        "dialog_plan_summary": "派生シナリオ{variants}個、既存{exists}個、作成不可{failed}個。",
+        "button_export_json": "JSONに出力...",
+        "button_export_csv": "CSVに出力...",
+        "dialog_batch_title": "一括生成",
+        "dialog_batch_prompt": "シナリオ名、ワイルドカード（例: VT *）、またはプレイリストの .json を ';' で区切って入力:",
+        "dialog_batch_confirm": "{scenarios}個のシナリオから{variants}個の派生シナリオを作成します。\n\n既存のファイルを上書きしますか？（いいえ＝スキップ）",
+        "error_batch_no_match": "一致するシナリオがありません。",
         "frame_log": "ステータスログ",
         "button_select_all": "すべて選択",
         "button_deselect_all": "すべて選択解除",
         "dialog_overwrite_title": "上書き確認",
-        "dialog_overwrite_text": 'ファイル "{filename}" は既に存在します。\n\nこのファイルおよび今後の競合に対してどのように処理しますか？',
+        "dialog_overwrite_text": '{total}個のうち{count}個の派生シナリオは既に存在します。\n\n上書きするファイルを選択してください。それ以外はスキップされます。',
         "dialog_save_profile_title": "プロファイルを名前を付けて保存",
         "dialog_save_profile_prompt": "新しいプロファイルの名前を入力してください:",
         "dialog_rename_profile_title": "プロファイルの名前を変更",
@@ -95,220 +130,115 @@ LANGUAGES = {
     }
 }
 
-# --- MASTER MODIFIER CONFIGURATION ---
-# --- FIX 2: Unique value_key for each modifier to prevent data bleeding ---
-MODIFIER_CONFIG = {
-    "SIZE": { "display_name": "Size", "tag_text": "Size", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MainBBRadius"], "condition": None, "suffix": "%", "value_key": "size_percentages" },
-    "SPEED": { "display_name": "Speed", "tag_text": "Speed", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MaxSpeed", "MaxCrouchSpeed"], "condition": "value > 0", "suffix": "%", "value_key": "speed_percentages" },
-    "TIMESCALE": { "display_name": "Timescale", "tag_text": "Timescale", "mod_type": "Multiplier", "scope": "Global", "properties": ["Timescale"], "condition": None, "suffix": "%", "value_key": "timescale_percentages" },
-    "DURATION": { "display_name": "Duration", "tag_text": "Dur", "mod_type": "Direct", "scope": "Global", "properties": ["Timelimit"], "condition": None, "suffix": "s", "value_key": "durations" },
-    "HP": { "display_name": "HP", "tag_text": "HP", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MaxHealth"], "condition": None, "suffix": "%", "value_key": "hp_percentages" },
-    "REGEN_RATE": { "display_name": "Regen", "tag_text": "Regen", "mod_type": "Calculated", "scope": "Character Profile", "properties": ["HealthRegenPerSec"], "calculation_base": "MaxHealth", "condition": None, "suffix": "%", "value_key": "regen_percentages" }
-}
-
-# --- CORE LOGIC ---
-SETTINGS_FILE = "settings.json"
-DEFAULT_KOVAAKS_PATH = r"C:\Program Files (x86)\Steam\steamapps\common\FPSAimTrainer\FPSAimTrainer\Saved\SaveGames\Scenarios"
-
-def get_variant_tag(tag_text, suffix, value):
-    if suffix == "s": return f"{tag_text} {value}s"
-    else: return f"{tag_text} {value}%"
-def get_base_scenario_name(full_name, current_tags):
-    base_name = full_name
-    for tag in current_tags:
-        pattern = r' (\b' + re.escape(tag) + r'\b .*?)(?=( \b[A-Z][a-z]*\b|$))'
-        base_name = re.split(pattern, base_name, 1)[0]
-    return base_name.strip()
-def get_default_profile():
-    profile = {
-        "folder_path": DEFAULT_KOVAAKS_PATH,
-        # --- FIX 2: Unique keys for each percentage list ---
-        "size_percentages": [50, 60, 70, 80, 90, 110, 120, 130, 140, 150, 200],
-        "speed_percentages": [50, 60, 70, 80, 90, 110, 120, 130, 140, 150, 200],
-        "timescale_percentages": [50, 60, 70, 80, 90, 110, 120, 130, 140, 150, 200],
-        "durations": [15, 30, 45, 60, 90, 120],
-        "hp_percentages": [20, 50, 80, 90, 110, 130, 150, 200, 300],
-        "regen_percentages": [10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
-        "checkboxes": {}, "variant_tags": {key: config['tag_text'] for key, config in MODIFIER_CONFIG.items()}
-    }
-    for key, config in MODIFIER_CONFIG.items():
-        value_list = profile[config['value_key']]
-        for i, value in enumerate(value_list):
-            is_checked = not (key in ["HP", "REGEN_RATE"] or (key == "DURATION" and value == 60))
-            profile["checkboxes"][f"{key}_{i}"] = is_checked
-    return profile
-def save_settings(settings_data):
-    try:
-        # Cleanup old/deprecated keys before saving
-        for profile in settings_data.get("profiles", {}).values():
-            if "legacy_timescale_mode" in profile: del profile["legacy_timescale_mode"]
-            if "percentages" in profile: del profile["percentages"] # Old shared key
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f: json.dump(settings_data, f, indent=4)
-        print("Settings saved.")
-    except Exception as e: print(f"Error saving settings: {e}")
-def load_settings():
-    try:
-        with open(SETTINGS_FILE, 'r') as f:
-            settings = json.load(f)
-            if "language" not in settings: settings["language"] = "EN"
-            if "profiles" in settings and "last_active_profile" in settings:
-                # --- FIX 2: Backwards compatibility for old settings files ---
-                for pname, profile in settings["profiles"].items():
-                    if "percentages" in profile and "size_percentages" not in profile:
-                        print(f"Migrating old settings for profile '{pname}'...")
-                        profile["size_percentages"] = profile.get("percentages", get_default_profile()["size_percentages"])
-                        profile["speed_percentages"] = profile.get("percentages", get_default_profile()["speed_percentages"])
-                        profile["timescale_percentages"] = profile.get("percentages", get_default_profile()["timescale_percentages"])
-                return settings
-            else:
-                print("Old or invalid settings file detected. Creating a fresh one.")
-                migrated_profile = get_default_profile()
-                if "folder_path" in settings: migrated_profile["folder_path"] = settings["folder_path"]
-                return {"language": "EN", "last_active_profile": "Default", "profiles": {"Default": migrated_profile}}
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"language": "EN", "last_active_profile": "Default", "profiles": {"Default": get_default_profile()}}
-def parse_scenario_file(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8-sig') as f: lines = f.readlines()
-    except Exception: return None
-    extracted_data = { "all_lines": lines, "scenario_name": "N/A", "player_profile_name": None, "character_profiles": {}, "global_properties": {} }
-    in_any_section = False
-    for line in lines:
-        if line.strip().startswith('['): in_any_section = True
-        if '=' not in line: continue
-        key_part, value_part = line.split('=', 1); key = key_part.strip().lower(); value = value_part.strip()
-        if key == "playercharacters": extracted_data["player_profile_name"] = value.split('.')[0]
-        if not in_any_section and key == "name": extracted_data["scenario_name"] = value
-        for mod_key, config in MODIFIER_CONFIG.items():
-            if config['scope'] == 'Global':
-                if not in_any_section:
-                    for prop in config['properties']:
-                        if key == prop.lower(): extracted_data['global_properties'][prop] = float(value)
-                if key == "scoreperhit": extracted_data['global_properties']["ScorePerHit"] = float(value)
-                elif key == "scoreperdamage": extracted_data['global_properties']["ScorePerDamage"] = float(value)
-                elif key == "scoreperkill": extracted_data['global_properties']["ScorePerKill"] = float(value)
-    current_profile_name = None; in_char_profile_section = False
-    for line in lines:
-        line_strip = line.strip()
-        if line_strip.lower() == "[character profile]": in_char_profile_section = True; current_profile_name = None; continue
-        if in_char_profile_section and line_strip.startswith('['): in_char_profile_section = False; current_profile_name = None; continue
-        if in_char_profile_section:
-            if '=' not in line_strip: continue
-            key, value = line_strip.split('=', 1); key, value = key.strip(), value.strip()
-            if key.lower() == "name":
-                current_profile_name = value
-                if current_profile_name not in extracted_data["character_profiles"]: extracted_data["character_profiles"][current_profile_name] = {}
-            if current_profile_name:
-                all_char_props = set()
-                for cfg in MODIFIER_CONFIG.values():
-                    if cfg['scope'] == 'Character Profile':
-                        all_char_props.update(cfg['properties'])
-                        if cfg.get('calculation_base'): all_char_props.add(cfg['calculation_base'])
-                if key in all_char_props:
-                    extracted_data["character_profiles"][current_profile_name][key] = float(value)
-    return extracted_data
-def create_variant_file(base_data, folder_path, variant_type_key, new_value, variant_configs):
-    user_provided_name = base_data['user_provided_name'].strip(); internal_name_to_replace = base_data['scenario_name'].strip()
-    multiplier = new_value / 100.0; config = MODIFIER_CONFIG[variant_type_key.upper()]; ui_config = variant_configs[variant_type_key.upper()]
-    variant_tag = get_variant_tag(ui_config['tag_text'], ui_config['suffix'], new_value)
-    base_name_for_new_file = user_provided_name
-    current_tag_text = ui_config['tag_text']
-    existing_tag_pattern = r' (\b' + re.escape(current_tag_text) + r'\b \d+s?)'
-    if ui_config['suffix'] == '%':
-         existing_tag_pattern = r' (\b' + re.escape(current_tag_text) + r'\b \d+%)'
-    match = re.search(existing_tag_pattern, base_name_for_new_file)
-    if match:
-        new_scenario_name = base_name_for_new_file.replace(match.group(1), f" {variant_tag}")
-    else:
-        clean_base = get_base_scenario_name(base_name_for_new_file, [cfg['tag_text'] for cfg in variant_configs.values()])
-        if f" {current_tag_text} " in user_provided_name:
-             base_name_for_new_file = clean_base
-        new_scenario_name = f"{base_name_for_new_file} {variant_tag}"
-    new_filename = os.path.join(folder_path, new_scenario_name + ".sce")
-    lines = base_data["all_lines"][:]; found_name = False; current_profile_name = None; in_char_profile_section = False; in_any_section = False
-    player_name = base_data.get("player_profile_name")
-    v_key_upper = variant_type_key.upper()
-    new_timelimit_value = 0
-    score_ratio = 1.0
-    if v_key_upper == "DURATION":
-        base_timelimit = base_data['global_properties'].get("Timelimit", 0)
-        base_timescale = base_data['global_properties'].get("Timescale", 1.0)
-        if base_timelimit <= 0: return "error_timelimit"
-        if base_timescale > 0 and base_timescale != 1.0:
-            base_perceived_duration = base_timelimit / base_timescale
-            score_ratio = base_perceived_duration / new_value if new_value > 0 else 1.0
-            duration_multiplier = new_value / base_perceived_duration if base_perceived_duration > 0 else 1.0
-            new_timelimit_value = base_timelimit * duration_multiplier
-        else:
-            score_ratio = base_timelimit / new_value if new_value > 0 else 1.0
-            new_timelimit_value = float(new_value)
-    for i, line in enumerate(lines):
-        line_strip = line.strip()
-        if line_strip.startswith('['):
-            in_any_section = True
-            if line_strip.lower() == "[character profile]": in_char_profile_section = True; current_profile_name = None
-            else: in_char_profile_section = False
-            continue
-        if '=' not in line: continue
-        key_raw, value_raw = line.split('=', 1); key_strip = key_raw.strip(); key_lower = key_strip.lower()
-        if not in_any_section and key_lower == "name" and value_raw.strip().lower() == internal_name_to_replace.lower():
-            lines[i] = f"{key_strip}={new_scenario_name}\n"; found_name = True; continue
-        if v_key_upper == "DURATION" and not in_any_section:
-            if key_lower == "timelimit": lines[i] = f"{key_strip}={new_timelimit_value:.1f}\n"
-            if key_lower == "scoreperhit" and base_data['global_properties'].get("ScorePerHit", 0) > 0: lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerHit'] * score_ratio:.3f}\n"
-            if key_lower == "scoreperdamage" and base_data['global_properties'].get("ScorePerDamage", 0) > 0: lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerDamage'] * score_ratio:.3f}\n"
-            if key_lower == "scoreperkill" and base_data['global_properties'].get("ScorePerKill", 0) > 0: lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerKill'] * score_ratio:.3f}\n"
-        elif v_key_upper == "TIMESCALE" and not in_any_section:
-            if key_lower in [p.lower() for p in config['properties']]:
-                base_val = base_data['global_properties'].get(key_strip, 1.0)
-                lines[i] = f"{key_strip}={base_val * multiplier:.3f}\n"
-            elif key_lower == "timelimit":
-                base_val = base_data['global_properties'].get("Timelimit", 0)
-                if base_val > 0: lines[i] = f"{key_strip}={base_val * multiplier:.1f}\n"
-            # --- FIX 1: Add score compensation for Timescale ---
-            elif multiplier > 0: # Avoid division by zero
-                if key_lower == "scoreperhit" and base_data['global_properties'].get("ScorePerHit", 0) > 0:
-                    lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerHit'] / multiplier:.3f}\n"
-                if key_lower == "scoreperdamage" and base_data['global_properties'].get("ScorePerDamage", 0) > 0:
-                    lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerDamage'] / multiplier:.3f}\n"
-                if key_lower == "scoreperkill" and base_data['global_properties'].get("ScorePerKill", 0) > 0:
-                    lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerKill'] / multiplier:.3f}\n"
-        elif config['scope'] == 'Character Profile' and in_char_profile_section:
-            if key_lower == "name": current_profile_name = value_raw.strip()
-            if current_profile_name and current_profile_name != player_name:
-                if key_lower in [p.lower() for p in config['properties']]:
-                    if config['mod_type'] == 'Multiplier':
-                        base_val = base_data["character_profiles"].get(current_profile_name, {}).get(key_strip, 0); should_modify = not (config['condition'] == "value > 0" and not base_val > 0)
-                        if should_modify: lines[i] = f"{key_strip}={base_val * multiplier:.5f}\n"
-                    elif config['mod_type'] == 'Calculated':
-                        calc_base_prop = config['calculation_base']
-                        base_val = base_data["character_profiles"].get(current_profile_name, {}).get(calc_base_prop, 0)
-                        calculated_value = base_val * multiplier
-                        lines[i] = f"{key_strip}={calculated_value:.5f}\n"
-    if not found_name:
-        messagebox.showerror("Parsing Error", f"Could not find the name line in the file.\n\nLooking for: '{internal_name_to_replace}'"); return "name_not_found"
-    try:
-        with open(new_filename, 'w', encoding='utf-8') as f: f.writelines(lines)
-        print(f"✅ Created: {new_scenario_name}.sce"); return "success"
-    except Exception as e:
-        print(f"❌ ERROR creating {new_filename}: {e}"); return "error"
+GENERATION_POLL_MS = 30
+GENERATION_MAX_IN_FLIGHT = GENERATION_WORKERS * 4
+LOAD_POLL_MS = 20
+LOG_FLUSH_MS = 50
+LOG_MAX_LINES = 5000
 
 # --- UI Application Classes ---
 # (No changes here)
-class RedirectText:
-    def __init__(self, text_widget): self.text_space = text_widget
-    def write(self, string): self.text_space.config(state='normal'); self.text_space.insert('end', string); self.text_space.see('end'); self.text_space.config(state='disabled')
+class QueueLogSink:
+    # sys.stdout/stderr replacement that is safe to print to from any thread: write() only queues the text, and
+    # the Tk thread moves everything queued into the widget with a single insert every LOG_FLUSH_MS. The widget
+    # keeps the last max_lines lines, so a long session doesn't grow the log without limit.
+    def __init__(self, root, text_widget, max_lines=LOG_MAX_LINES):
+        self.root = root; self.text_space = text_widget; self.max_lines = max_lines; self.pending = queue.SimpleQueue()
+        self.root.after(LOG_FLUSH_MS, self._flush_to_widget)
+    def write(self, string):
+        if string: self.pending.put(string)
+        return len(string)
     def flush(self): pass
-class OverwriteDialog(tk.Toplevel):
-    def __init__(self, parent, filename):
+    def _flush_to_widget(self):
+        chunks = []
+        try:
+            while True: chunks.append(self.pending.get_nowait())
+        except queue.Empty: pass
+        if chunks:
+            text = "".join(chunks)
+            if text.count("\n") > self.max_lines: text = "\n".join(text.split("\n")[-self.max_lines - 1:]) # only the tail of a big burst can survive the limit anyway
+            self.text_space.config(state='normal'); self.text_space.insert('end', text)
+            line_count = int(self.text_space.index('end-1c').split('.')[0])
+            if line_count > self.max_lines: self.text_space.delete('1.0', f"{line_count - self.max_lines + 1}.0")
+            self.text_space.see('end'); self.text_space.config(state='disabled')
+        self.root.after(LOG_FLUSH_MS, self._flush_to_widget)
+class ConflictDialog(tk.Toplevel):
+    # Asked once, before anything is written, for all files of the run that already exist.
+    # result is the set of indices into `filenames` to overwrite, or None when the run is cancelled.
+    def __init__(self, parent, filenames, total):
         super().__init__(parent);
         lang = app.current_lang if 'app' in globals() else 'EN'
-        self.title(LANGUAGES[lang]['dialog_overwrite_title']); self.result = "no"
-        message = LANGUAGES[lang]['dialog_overwrite_text'].format(filename=filename)
-        ttk.Label(self, text=message, wraplength=350, justify='center').pack(padx=20, pady=20); btn_frame = ttk.Frame(self); btn_frame.pack(padx=10, pady=10); ttk.Button(btn_frame, text="Yes", command=lambda: self.set_result_and_close("yes")).pack(side="left", padx=5); ttk.Button(btn_frame, text="No", command=lambda: self.set_result_and_close("no")).pack(side="left", padx=5); ttk.Button(btn_frame, text="Yes to All", command=lambda: self.set_result_and_close("yes_all")).pack(side="left", padx=5); ttk.Button(btn_frame, text="No to All", command=lambda: self.set_result_and_close("no_all")).pack(side="left", padx=5)
+        self.title(LANGUAGES[lang]['dialog_overwrite_title']); self.result = None
+        message = LANGUAGES[lang]['dialog_overwrite_text'].format(count=len(filenames), total=total)
+        ttk.Label(self, text=message, wraplength=420, justify='center').pack(padx=20, pady=(20, 10))
+        list_frame = ttk.Frame(self); list_frame.pack(fill="both", expand=True, padx=20)
+        self.listbox = tk.Listbox(list_frame, height=min(len(filenames), 12), width=70, selectmode="extended", exportselection=False); self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview); scrollbar.pack(side="right", fill="y"); self.listbox.config(yscrollcommand=scrollbar.set)
+        self.listbox.insert(tk.END, *filenames)
+        btn_frame = ttk.Frame(self); btn_frame.pack(padx=10, pady=10); ttk.Button(btn_frame, text="Overwrite Selected", command=lambda: self.set_result_and_close(set(self.listbox.curselection()))).pack(side="left", padx=5); ttk.Button(btn_frame, text="Overwrite All", command=lambda: self.set_result_and_close(set(range(len(filenames))))).pack(side="left", padx=5); ttk.Button(btn_frame, text="Skip All", command=lambda: self.set_result_and_close(set())).pack(side="left", padx=5); ttk.Button(btn_frame, text="Cancel", command=lambda: self.set_result_and_close(None)).pack(side="left", padx=5)
+        self.protocol("WM_DELETE_WINDOW", lambda: self.set_result_and_close(None))
         self.transient(parent); self.grab_set(); self.wait_window(self)
     def set_result_and_close(self, result): self.result = result; self.destroy()
+class VirtualListbox(ttk.Frame):
+    # A Listbox that only ever holds the visible rows of `items`. Scrolling re-renders `height` rows,
+    # so the cost of filling or scrolling it doesn't depend on how many scenarios the folder has.
+    def __init__(self, parent, height=6, on_select=None):
+        super().__init__(parent)
+        self.items = []; self.top = 0; self.selected = None; self.height = height; self.on_select = on_select
+        self.listbox = tk.Listbox(self, height=height, exportselection=False); self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar); self.scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel); self.listbox.bind("<Button-4>", self._on_mousewheel); self.listbox.bind("<Button-5>", self._on_mousewheel)
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1)); self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self._render()
+    def set_items(self, items): self.items = items; self.top = 0; self.selected = None; self._render()
+    def _render(self):
+        self.listbox.delete(0, tk.END); rows = self.items[self.top:self.top + self.height]
+        if rows: self.listbox.insert(tk.END, *rows)
+        if self.selected is not None and self.top <= self.selected < self.top + self.height: self.listbox.selection_set(self.selected - self.top)
+        total = len(self.items)
+        if total > self.height: self.scrollbar.set(self.top / total, (self.top + self.height) / total)
+        else: self.scrollbar.set(0, 1)
+    def _scroll_to(self, top):
+        top = max(0, min(top, len(self.items) - self.height))
+        if top != self.top: self.top = top; self._render()
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto": self._scroll_to(round(float(amount) * len(self.items)))
+        elif action == "scroll": self._scroll_to(self.top + int(amount) * (self.height if unit == "pages" else 1))
+    def _on_mousewheel(self, event):
+        step = -3 if (event.num == 4 or event.delta > 0) else 3
+        self._scroll_to(self.top + step); return "break"
+    def _move_selection(self, step):
+        if not self.items: return "break"
+        self.selected = 0 if self.selected is None else max(0, min(len(self.items) - 1, self.selected + step))
+        if self.selected < self.top: self.top = self.selected
+        elif self.selected >= self.top + self.height: self.top = self.selected - self.height + 1
+        self._render()
+        if self.on_select: self.on_select(self.items[self.selected])
+        return "break"
+    def _on_listbox_select(self, event=None):
+        selected_indices = self.listbox.curselection()
+        if not selected_indices: return
+        self.selected = self.top + selected_indices[0]
+        if self.on_select: self.on_select(self.items[self.selected])
 
+class PlanDialog(tk.Toplevel):
+    # Shows a dry-run plan (one row per variant with every key it changes) and exports it; not modal
+    def __init__(self, parent, entries):
+        super().__init__(parent)
+        lang = LANGUAGES[app.current_lang if 'app' in globals() else 'EN']
+        self.title(lang['dialog_plan_title']); self.entries = entries
+        summary = lang['dialog_plan_summary'].format(variants=len(entries), exists=sum(entry["exists"] for entry in entries), failed=sum(entry["status"] != "success" for entry in entries))
+        ttk.Label(self, text=summary).pack(anchor="w", padx=10, pady=(10, 5))
+        self.view = VirtualListbox(self, height=20); self.view.listbox.config(width=140); self.view.pack(fill="both", expand=True, padx=10)
+        self.view.set_items([format_plan_entry(entry) for entry in entries])
+        btn_frame = ttk.Frame(self); btn_frame.pack(padx=10, pady=10); ttk.Button(btn_frame, text=lang['button_export_json'], command=lambda: self.export(".json")).pack(side="left", padx=5); ttk.Button(btn_frame, text=lang['button_export_csv'], command=lambda: self.export(".csv")).pack(side="left", padx=5); ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="left", padx=5)
+        self.transient(parent)
+    def export(self, extension):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=extension, filetypes=[(extension[1:].upper(), "*" + extension)])
+        if not path: return
+        try: print(f"✅ Exported plan of {export_plan(self.entries, path)} variants: {path}")
+        except Exception as e: messagebox.showerror("Error", str(e), parent=self)
 class VariantGeneratorApp:
     def __init__(self, root):
         self.root = root
@@ -319,15 +249,27 @@ class VariantGeneratorApp:
         self.active_profile_name = self.settings["last_active_profile"]
         if self.active_profile_name not in self.settings["profiles"]: self.active_profile_name = list(self.settings["profiles"].keys())[0]
         self.variant_configs = {}; self.loaded_scenario_data = None; self.is_edit_mode = False; self.checkbox_vars = {}
-        self.all_scenarios = []; self._after_id = None
+        self.all_scenarios = []; self._after_id = None; self._selecting_from_list = False; self.generation_state = None; self.scenario_index = load_scenario_index(); self.scenario_search = ScenarioSearch([])
+        self.load_executor = ThreadPoolExecutor(max_workers=1); self.load_results = queue.Queue(); self._load_request_id = 0; self._load_future = None; self._load_polling = False
+        self.scenario_cache = ScenarioCache(self.settings.get("scenario_cache_mb", SCENARIO_CACHE_MAX_MB) * 1024 * 1024)
+        # The catalog answers "timelimit=60 bots>1" style filters in the search box; it is refreshed on its own thread
+        try: self.scenario_catalog = ScenarioCatalog()
+        except Exception as e: self.scenario_catalog = None; print(f"Scenario catalog unavailable: {e}")
+        self.catalog_executor = ThreadPoolExecutor(max_workers=1); self._catalog_future = None; self._catalog_matches = {}
         default_font = font.nametofont("TkDefaultFont"); self.header_font = font.Font(family=default_font.cget("family"), size=default_font.cget("size")+2, weight="bold")
         self._create_widgets()
+        self.folder_path_var.set(self.settings["profiles"][self.active_profile_name]["folder_path"])
+        self._update_ui_text()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        # The variant columns and the scenario list are the slow part of startup; build them once the window is up
+        self.root.after_idle(self._finish_startup)
+    def _finish_startup(self):
+        window_shown_ms = (time.perf_counter() - _STARTUP_T0) * 1000
         self._load_profile(self.active_profile_name)
         self._populate_scenario_list()
         self._update_ui_text()
-        sys.stdout = RedirectText(self.log_widget); sys.stderr = RedirectText(self.log_widget)
-        print("Application started. Load a scenario to begin.")
-        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        sys.stdout = sys.stderr = QueueLogSink(self.root, self.log_widget, self.settings.get("log_max_lines", LOG_MAX_LINES))
+        print(f"Application started in {(time.perf_counter() - _STARTUP_T0) * 1000:.0f} ms (window shown after {window_shown_ms:.0f} ms). Load a scenario to begin.")
         self.ui_ready = True
 
     def _update_ui_text(self):
@@ -351,8 +293,11 @@ class VariantGeneratorApp:
         self.label_timescale.config(text=lang["stats_timescale"])
         self.label_duration.config(text=lang["stats_duration"])
         self.frame3.config(text=lang["frame_variants"])
-        self.edit_button.config(text=lang["button_edit_values"] if not self.is_edit_mode else lang["button_save_values"])
+        if hasattr(self, 'edit_button'): self.edit_button.config(text=lang["button_edit_values"] if not self.is_edit_mode else lang["button_save_values"])
         self.generate_button.config(text=lang["button_generate"])
+        self.cross_product_check.config(text=lang["check_cross_product"])
+        self.batch_button.config(text=lang["button_batch"])
+        self.preview_button.config(text=lang["button_preview"])
         self.log_frame.config(text=lang["frame_log"])
         for vtype_key, config in self.variant_configs.items():
             if 'widgets' in config:
@@ -378,7 +323,7 @@ class VariantGeneratorApp:
         self.scenario_name_var = tk.StringVar(); self.scenario_name_var.trace_add("write", self._schedule_load_from_entry)
         self.label_scenario_name = ttk.Label(self.frame1); self.label_scenario_name.grid(row=1, column=0, sticky="w", padx=5)
         ttk.Entry(self.frame1, textvariable=self.scenario_name_var, width=80).grid(row=1, column=1, sticky="ew", padx=5)
-        list_frame = ttk.Frame(self.frame1); list_frame.grid(row=2, column=1, sticky="ew", padx=5, pady=(5,0)); self.scenario_listbox = tk.Listbox(list_frame, height=6, exportselection=False); self.scenario_listbox.pack(side="left", fill="both", expand=True); scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.scenario_listbox.yview); scrollbar.pack(side="right", fill="y"); self.scenario_listbox.config(yscrollcommand=scrollbar.set); self.scenario_listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.scenario_listbox = VirtualListbox(self.frame1, height=6, on_select=self._on_listbox_select); self.scenario_listbox.grid(row=2, column=1, sticky="ew", padx=5, pady=(5,0))
         self.frame_profiles = ttk.LabelFrame(main_frame, padding="10"); self.frame_profiles.grid(row=2, column=0, sticky="ew", pady=5)
         self.label_active_profile = ttk.Label(self.frame_profiles); self.label_active_profile.pack(side="left", padx=(0, 5))
         self.profile_combobox = ttk.Combobox(self.frame_profiles, state="readonly", width=20); self.profile_combobox.pack(side="left", padx=5); self.profile_combobox.bind("<<ComboboxSelected>>", self._on_profile_select)
@@ -399,6 +344,10 @@ class VariantGeneratorApp:
         self.frame3 = ttk.LabelFrame(main_frame, padding="10"); self.frame3.grid(row=4, column=0, sticky="ew", pady=5)
         generate_frame = ttk.Frame(main_frame); generate_frame.grid(row=5, column=0, sticky="ew")
         self.generate_button = ttk.Button(generate_frame, command=self._on_generate, state="disabled"); self.generate_button.pack(side="left", pady=10)
+        self.batch_button = ttk.Button(generate_frame, command=self._on_batch_generate); self.batch_button.pack(side="left", padx=(10, 0), pady=10)
+        self.preview_button = ttk.Button(generate_frame, command=self._on_preview_plan); self.preview_button.pack(side="left", padx=(10, 0), pady=10)
+        self.cross_product_var = tk.BooleanVar(value=False); self.cross_product_var.trace_add("write", self._on_settings_change)
+        self.cross_product_check = ttk.Checkbutton(generate_frame, variable=self.cross_product_var); self.cross_product_check.pack(side="left", padx=(10, 0), pady=10)
         self.progress_bar = ttk.Progressbar(generate_frame, orient='horizontal', length=500, mode='determinate'); self.progress_bar.pack(side="left", fill="x", expand=True, pady=10, padx=(20,10))
         self.log_frame = ttk.LabelFrame(main_frame, padding="5"); self.log_frame.grid(row=6, column=0, sticky="ew"); self.log_widget = tk.Text(self.log_frame, height=8, state='disabled', wrap='word', font=("Courier New", 9)); self.log_widget.pack(fill="both", expand=True)
 
@@ -414,24 +363,55 @@ class VariantGeneratorApp:
         self.all_scenarios = []; folder = self.folder_path_var.get()
         if not os.path.isdir(folder): return
         try:
-            for filename in os.listdir(folder):
-                if filename.lower().endswith(".sce"): self.all_scenarios.append(filename[:-4])
-            self.all_scenarios.sort(key=str.lower); self._update_filtered_list()
+            self.all_scenarios = sorted(refresh_folder_index(self.scenario_index, folder), key=str.lower); self.scenario_search = ScenarioSearch(self.all_scenarios); self._update_filtered_list()
         except Exception as e: print(f"Error reading scenario folder: {e}")
+        self._refresh_catalog()
+    def _add_created_scenarios(self, folder, scenario_names):
+        try:
+            scenarios = record_created_scenarios(self.scenario_index, folder, scenario_names)
+            if folder == self.folder_path_var.get(): self.all_scenarios = sorted(scenarios, key=str.lower); self.scenario_search = ScenarioSearch(self.all_scenarios); self._update_filtered_list()
+        except Exception as e: print(f"Error reading scenario folder: {e}")
+        if folder == self.folder_path_var.get(): self._refresh_catalog()
+    def _refresh_catalog(self):
+        # Rescans only files whose mtime/size moved; the first run over a big folder takes a while, so it never blocks the UI
+        folder = self.folder_path_var.get()
+        if self.scenario_catalog is None or not os.path.isdir(folder): return
+        polling = self._catalog_future is not None
+        self._catalog_future = self.catalog_executor.submit(self.scenario_catalog.refresh, folder, [config['tag_text'] for config in self.variant_configs.values()] or None)
+        if not polling: self.root.after(LOAD_POLL_MS, self._poll_catalog_refresh)
+    def _poll_catalog_refresh(self):
+        if not self._catalog_future.done(): self.root.after(LOAD_POLL_MS, self._poll_catalog_refresh); return
+        future = self._catalog_future; self._catalog_future = None; self._catalog_matches = {}
+        try:
+            refresh = future.result()
+            if refresh["updated"] or refresh["removed"]: print(f"Scenario catalog: {refresh['updated']} scanned, {refresh['removed']} removed ({refresh['seconds'] * 1000:.0f} ms).")
+        except Exception as e: print(f"Error refreshing scenario catalog: {e}"); return
+        if parse_catalog_query(self.scenario_name_var.get())[0]: self._update_filtered_list()
     def _update_filtered_list(self, *args):
-        search_term = self.scenario_name_var.get().lower(); self.scenario_listbox.delete(0, tk.END)
-        for name in self.all_scenarios:
-            if not search_term or search_term in name.lower(): self.scenario_listbox.insert(tk.END, name)
+        # Filter terms (see variant_core/catalog.py) narrow the list through the catalog; the rest is the name search
+        filters, text = parse_catalog_query(self.scenario_name_var.get())
+        results = self.scenario_search.search(text, limit=None)
+        if filters and self.scenario_catalog is not None:
+            # Matches are kept per filter set until the next refresh. While a refresh holds the catalog's lock between its
+            # batches, an uncached filter isn't queried at all: the name matches show, and the refresh's end re-filters.
+            key = (self.folder_path_var.get(), tuple(filters))
+            if key not in self._catalog_matches and self._catalog_future is None:
+                try: self._catalog_matches[key] = set(self.scenario_catalog.find(key[0], filters))
+                except ValueError: pass # an unfinished term while typing ("bots>") - show the name matches meanwhile
+            if key in self._catalog_matches: results = [name for name in results if name in self._catalog_matches[key]]
+        self.scenario_listbox.set_items(results)
     def _schedule_load_from_entry(self, *args):
+        if self._selecting_from_list: return # the list already shows this name; re-filtering would reset its selection
         self._update_filtered_list()
         if self._after_id: self.root.after_cancel(self._after_id)
         self._after_id = self.root.after(500, self._on_load)
-    def _on_listbox_select(self, event=None):
-        selected_indices = self.scenario_listbox.curselection()
-        if not selected_indices: return
-        selected_name = self.scenario_listbox.get(selected_indices[0])
+    def _on_listbox_select(self, selected_name):
         if self._after_id: self.root.after_cancel(self._after_id); self._after_id = None
-        self.scenario_name_var.set(selected_name); self._on_load()
+        # A picked row (click or Up/Down) fills the entry without re-filtering the list, so the next arrow press moves on from it
+        self._selecting_from_list = True
+        try: self.scenario_name_var.set(selected_name)
+        finally: self._selecting_from_list = False
+        self._on_load()
     def _on_browse(self):
         folder = filedialog.askdirectory()
         if folder: self.folder_path_var.set(folder); self._populate_scenario_list()
@@ -461,7 +441,7 @@ class VariantGeneratorApp:
         for key, config in MODIFIER_CONFIG.items():
             # Gracefully handle missing keys for users with old settings files
             self.variant_configs[key] = {"values": profile_data.get(config['value_key'], get_default_profile()[config['value_key']]), "suffix": config['suffix'], "tag_text": profile_data["variant_tags"][key], "display_name": config['display_name'] if key == "DURATION" else profile_data["variant_tags"][key]}
-        self.folder_path_var.set(profile_data["folder_path"])
+        self.folder_path_var.set(profile_data["folder_path"]); self.cross_product_var.set(profile_data.get("cross_product", False))
         self._build_variant_columns()
         for key, value in profile_data["checkboxes"].items():
             if key in self.checkbox_vars: self.checkbox_vars[key].set(value)
@@ -502,55 +482,203 @@ class VariantGeneratorApp:
             new_active_profile = list(self.settings["profiles"].keys())[0]
             self._load_profile(new_active_profile); print(f"Profile '{profile_to_delete}' deleted.")
     def _on_load(self):
+        # Reading/parsing happens on a background thread; only the newest request's result is applied
+        self._load_request_id += 1
+        if self._load_future: self._load_future.cancel(); self._load_future = None # drops a stale request that hasn't started yet
         user_typed_name = self.scenario_name_var.get().strip(); folder_path = self.folder_path_var.get()
         if not folder_path or not user_typed_name: self.stat_vars["Scenario Name:"].set(LANGUAGES[self.current_lang]['stats_scenario_name']); return
-        full_path = os.path.join(folder_path, user_typed_name + ".sce")
-        if not os.path.exists(full_path):
+        full_path = os.path.join(folder_path, user_typed_name + ".sce"); request_id = self._load_request_id
+        if self.scenario_catalog is not None:
+            # Catalogued stats show as soon as they are looked up; the parse queued behind them is still needed before anything can be generated
+            catalog_future = self.load_executor.submit(self._catalog_stats_worker, folder_path, user_typed_name)
+            catalog_future.add_done_callback(lambda future: self.load_results.put((request_id, user_typed_name, full_path, future)))
+        self._load_future = self.load_executor.submit(self._load_scenario_worker, full_path)
+        self._load_future.add_done_callback(lambda future: self.load_results.put((request_id, user_typed_name, full_path, future)))
+        if not self._load_polling: self._load_polling = True; self.root.after(LOAD_POLL_MS, self._poll_scenario_load)
+    def _catalog_stats_worker(self, folder_path, user_typed_name):
+        # Runs on the loader thread: the os.stat and the catalog's lock stay off the Tk thread
+        try: return "catalog", self.scenario_catalog.get_stats(folder_path, user_typed_name), 0.0
+        except Exception: return "catalog", None, 0.0
+    def _load_scenario_worker(self, full_path):
+        # Runs on the loader thread: no Tk calls in here
+        if not os.path.exists(full_path): return "missing", None, 0.0
+        started = time.perf_counter()
+        try: scenario_data = self.scenario_cache.load(full_path)
+        except Exception: scenario_data = None
+        return "loaded", scenario_data, time.perf_counter() - started
+    def _poll_scenario_load(self):
+        try:
+            while True:
+                request_id, user_typed_name, full_path, future = self.load_results.get_nowait()
+                if request_id != self._load_request_id or future.cancelled(): continue
+                status, scenario_data, load_seconds = future.result()
+                if status == "catalog":
+                    if scenario_data: self._show_scenario_stats(user_typed_name, scenario_data)
+                    continue
+                self._load_polling = False; self._load_future = None
+                self._apply_loaded_scenario(user_typed_name, full_path, status, scenario_data, load_seconds); return
+        except queue.Empty: pass
+        if self._load_future is None: self._load_polling = False; return
+        self.root.after(LOAD_POLL_MS, self._poll_scenario_load)
+    def _apply_loaded_scenario(self, user_typed_name, full_path, status, scenario_data, load_seconds=0.0):
+        if status == "missing":
             self.generate_button.config(state="disabled"); self.stat_vars["Scenario Name:"].set(LANGUAGES[self.current_lang]['stats_scenario_name']); return
         print(f"Attempting to load: {full_path}")
-        self.loaded_scenario_data = parse_scenario_file(full_path)
+        self.loaded_scenario_data = scenario_data
         if self.loaded_scenario_data:
-            self.loaded_scenario_data["user_provided_name"] = user_typed_name; self.stat_vars["Scenario Name:"].set(f"{LANGUAGES[self.current_lang]['label_scenario_name']} {user_typed_name}")
-            self.stat_vars["Timescale:"].set(self.loaded_scenario_data.get('global_properties', {}).get('Timescale', 'N/A'))
-            duration = self.loaded_scenario_data.get('global_properties', {}).get('Timelimit', 'N/A'); self.stat_vars["Duration:"].set(f"{duration:.1f}s" if isinstance(duration, (int, float)) else "N/A")
-            player_name = self.loaded_scenario_data.get("player_profile_name"); all_profiles = self.loaded_scenario_data.get("character_profiles", {})
-            target_names = [name for name in all_profiles.keys() if name != player_name]
-            if target_names:
-                self.stat_vars["Target(s):"].set(", ".join(target_names)); first_target_profile = all_profiles.get(target_names[0], {})
-                self.stat_vars["Target Radius:"].set(first_target_profile.get("MainBBRadius", "N/A")); self.stat_vars["Target Max Speed:"].set(first_target_profile.get("MaxSpeed", "N/A")); self.stat_vars["Target HP:"].set(first_target_profile.get("MaxHealth", "N/A")); self.stat_vars["Target Regen/s:"].set(first_target_profile.get("HealthRegenPerSec", "N/A"))
-            else:
-                for key in self.stat_vars:
-                    if key != "Scenario Name:": self.stat_vars[key].set("N/A")
-            self.generate_button.config(state="normal"); print("✅ Success! Scenario file loaded.")
+            self.loaded_scenario_data["user_provided_name"] = user_typed_name; self._show_scenario_stats(user_typed_name, self.loaded_scenario_data)
+            self.generate_button.config(state="normal"); print(f"✅ Success! Scenario file loaded ({load_seconds * 1000:.1f} ms).")
         else:
             messagebox.showerror("Error", f"Found '{user_typed_name}.sce' but could not read or parse it."); self.generate_button.config(state="disabled")
+    def _show_scenario_stats(self, user_typed_name, scenario_data):
+        self.stat_vars["Scenario Name:"].set(f"{LANGUAGES[self.current_lang]['label_scenario_name']} {user_typed_name}")
+        self.stat_vars["Timescale:"].set(scenario_data.get('global_properties', {}).get('Timescale', 'N/A'))
+        duration = scenario_data.get('global_properties', {}).get('Timelimit', 'N/A'); self.stat_vars["Duration:"].set(f"{duration:.1f}s" if isinstance(duration, (int, float)) else "N/A")
+        player_name = scenario_data.get("player_profile_name"); all_profiles = scenario_data.get("character_profiles", {})
+        target_names = [name for name in all_profiles.keys() if name != player_name]
+        if target_names:
+            self.stat_vars["Target(s):"].set(", ".join(target_names)); first_target_profile = all_profiles.get(target_names[0], {})
+            self.stat_vars["Target Radius:"].set(first_target_profile.get("MainBBRadius", "N/A")); self.stat_vars["Target Max Speed:"].set(first_target_profile.get("MaxSpeed", "N/A")); self.stat_vars["Target HP:"].set(first_target_profile.get("MaxHealth", "N/A")); self.stat_vars["Target Regen/s:"].set(first_target_profile.get("HealthRegenPerSec", "N/A"))
+        else:
+            for key in self.stat_vars:
+                if key != "Scenario Name:": self.stat_vars[key].set("N/A")
     def _on_generate(self):
         if not self.loaded_scenario_data: messagebox.showerror("Error", "No scenario loaded."); return
+        if self.generation_state: return
         self._on_settings_change()
-        tasks = [];
-        for vtype_key, config in self.variant_configs.items():
-            for i, value in enumerate(config['values']):
-                if self.checkbox_vars[f"{vtype_key}_{i}"].get(): tasks.append((vtype_key, value))
-        if not tasks: print("--- No variants were selected. ---"); return
-        print(f"\n--- Starting Generation of {len(tasks)} variants ---")
-        self.progress_bar['maximum'] = len(tasks); created_count = 0; overwrite_decision = 'ask'
-        for i, (vtype, val) in enumerate(tasks):
-            should_create = True
-            if overwrite_decision != 'yes_all':
-                user_provided_name = self.loaded_scenario_data['user_provided_name'].strip(); current_tags = [cfg['tag_text'] for cfg in self.variant_configs.values()]; clean_base_name = get_base_scenario_name(user_provided_name, current_tags); config = self.variant_configs[vtype.upper()]; variant_tag = get_variant_tag(config['tag_text'], config['suffix'], val); new_scenario_name = f"{clean_base_name} {variant_tag}"; new_filename = new_scenario_name + ".sce"
-                if os.path.exists(os.path.join(self.folder_path_var.get(), new_filename)):
-                    if overwrite_decision == 'ask': dialog = OverwriteDialog(self.root, new_filename); overwrite_decision = dialog.result
-                    if overwrite_decision == 'no_all': print("⏩ Skipping all remaining overwrites."); break
-                    if overwrite_decision == 'no': print(f"⏩ Skipped: {new_filename}"); should_create = False
-            if should_create:
-                result = create_variant_file(self.loaded_scenario_data, self.folder_path_var.get(), vtype, val, self.variant_configs)
-                if result == "success": created_count += 1
-                elif result == "name_not_found": break
-                elif result == "error_timelimit": messagebox.showerror("Error", f"Cannot create duration variant for a scenario with Timelimit=0."); break
-            self.progress_bar['value'] = i + 1; self.root.update_idletasks()
-        print(f"--- Finished! Created {created_count} new files. ---")
+        selected_values = self._get_selected_values()
+        cross_product = self.cross_product_var.get(); total = count_variant_tasks(selected_values, cross_product)
+        if not total: print("--- No variants were selected. ---"); return
+        base_data = self.loaded_scenario_data; folder_path = self.folder_path_var.get()
+        if not get_variant_template(base_data)["name_found"]:
+            messagebox.showerror("Parsing Error", f"Could not find the name line in the file.\n\nLooking for: '{base_data['scenario_name'].strip()}'"); return
+        # Workers get a plain snapshot of the tag settings so later UI edits can't leak into a running batch
+        variant_configs = {key: {"tag_text": cfg['tag_text'], "suffix": cfg['suffix']} for key, cfg in self.variant_configs.items()}
+        # Pre-flight: every target name is worked out once against a single folder listing and all conflicts are
+        # settled in one dialog, so the run itself never stops to ask
+        skipped_tasks = {}
+        conflicts = scan_conflicts(base_data, folder_path, iter_variant_tasks(selected_values, cross_product), variant_configs)
+        if conflicts:
+            dialog = ConflictDialog(self.root, [new_scenario_name + ".sce" for modifiers, new_scenario_name in conflicts], total)
+            if dialog.result is None: print("--- Generation cancelled. ---"); return
+            skipped_tasks = {modifiers: new_scenario_name for i, (modifiers, new_scenario_name) in enumerate(conflicts) if i not in dialog.result}
+        print(f"\n--- Starting Generation of {total} variants ---")
+        self.progress_bar['maximum'] = total
+        self.generation_state = {"executor": ThreadPoolExecutor(max_workers=GENERATION_WORKERS), "queue": queue.Queue(), "tasks": iter_variant_tasks(selected_values, cross_product), "skipped_tasks": skipped_tasks,
+                                 "base_data": base_data, "folder": folder_path, "variant_configs": variant_configs, "pending": 0, "done": 0, "created": [], "unchanged": 0, "aborted": False,
+                                 "writer": VariantWriter(self.settings.get("fsync_policy", DEFAULT_FSYNC_POLICY)), "metrics": RunMetrics("generate")}
+        self.generate_button.config(state="disabled")
+        self._submit_generation_tasks()
+        self._poll_generation()
+    def _submit_generation_tasks(self):
+        # Tasks are pulled from the generator only as the pool has room, so huge cross-product grids never sit in
+        # memory. Existing files the pre-flight dialog said to keep are skipped here.
+        state = self.generation_state; base_data = state["base_data"]; variant_configs = state["variant_configs"]
+        while state["tasks"] is not None and state["pending"] < GENERATION_MAX_IN_FLIGHT:
+            modifiers = next(state["tasks"], None)
+            if modifiers is None: state["tasks"] = None; break
+            if modifiers in state["skipped_tasks"]: print(f"⏩ Skipped: {state['skipped_tasks'][modifiers]}.sce"); state["done"] += 1; continue
+            future = state["executor"].submit(generate_combined_variant, base_data, state["folder"], modifiers, variant_configs, writer=state["writer"], metrics=state["metrics"]); state["pending"] += 1
+            future.add_done_callback(state["queue"].put)
+    def _poll_generation(self):
+        state = self.generation_state
+        try:
+            while True:
+                future = state["queue"].get_nowait(); state["pending"] -= 1; state["done"] += 1
+                if future.cancelled(): continue
+                status, new_scenario_name, error_message = future.result()
+                if status == "success": state["created"].append(new_scenario_name); print(f"✅ Created: {new_scenario_name}.sce")
+                elif status == "unchanged": state["unchanged"] += 1; print(f"⏩ Unchanged: {new_scenario_name}.sce")
+                elif status == "error": print(error_message)
+                elif status == "error_timelimit" and not state["aborted"]:
+                    state["aborted"] = True; state["tasks"] = None; state["executor"].shutdown(wait=False, cancel_futures=True)
+                    messagebox.showerror("Error", f"Cannot create duration variant for a scenario with Timelimit=0.")
+        except queue.Empty: pass
+        self._submit_generation_tasks()
+        self.progress_bar['value'] = state["done"]
+        if state["pending"] > 0 or state["tasks"] is not None: self.root.after(GENERATION_POLL_MS, self._poll_generation); return
+        if "flush" not in state:
+            # The end-of-run flush reopens and fsyncs every written file, so like the batch run's it happens off the Tk thread
+            state["executor"].shutdown(wait=False)
+            flush_executor = ThreadPoolExecutor(max_workers=1); state["flush"] = flush_executor.submit(state["writer"].finish); flush_executor.shutdown(wait=False)
+        if not state["flush"].done(): self.root.after(GENERATION_POLL_MS, self._poll_generation); return
+        self.generation_state = None; self.generate_button.config(state="normal")
         # --- FIX 3: Refresh the scenario list after generation is complete ---
-        self._populate_scenario_list()
+        state["metrics"].timed("refresh", self._add_created_scenarios, state["folder"], state["created"])
+        self._report_run_metrics(state["metrics"], state["flush"].result())
+        print(f"--- Finished! Created {len(state['created'])} new files ({state['unchanged']} unchanged). ---")
+        self.progress_bar['value'] = 0
+    def _report_run_metrics(self, metrics, write_stats):
+        # Timing summary in the log; with "metrics_file" set in settings.json it is also appended there as a JSON line
+        run_summary = metrics.finish(write_stats); print(format_run_summary(run_summary))
+        if self.settings.get("metrics_file"):
+            try: append_run_metrics(self.settings["metrics_file"], run_summary)
+            except Exception as e: print(f"❌ Could not write metrics file: {e}")
+    def _on_preview_plan(self):
+        # Dry run of "Generate Variants": names and changed values for the current selection, all in memory
+        if not self.loaded_scenario_data: messagebox.showerror("Error", "No scenario loaded."); return
+        self._on_settings_change()
+        selected_values = self._get_selected_values(); cross_product = self.cross_product_var.get()
+        if not count_variant_tasks(selected_values, cross_product): print("--- No variants were selected. ---"); return
+        variant_configs = {key: {"tag_text": cfg['tag_text'], "suffix": cfg['suffix']} for key, cfg in self.variant_configs.items()}
+        PlanDialog(self.root, list(iter_variant_plan(self.loaded_scenario_data, self.folder_path_var.get(), iter_variant_tasks(selected_values, cross_product), variant_configs)))
+    def _get_selected_values(self):
+        return {vtype_key: [value for i, value in enumerate(config['values']) if self.checkbox_vars[f"{vtype_key}_{i}"].get()] for vtype_key, config in self.variant_configs.items()}
+    def _on_batch_generate(self):
+        # Same selection as "Generate Variants", applied to every matching base scenario in one background run
+        if self.generation_state: return
+        lang = LANGUAGES[self.current_lang]
+        self._on_settings_change()
+        sources = askstring(lang["dialog_batch_title"], lang["dialog_batch_prompt"], parent=self.root)
+        if not sources or sources.isspace(): return
+        folder_path = self.folder_path_var.get()
+        try: scenario_paths = resolve_batch_scenarios(folder_path, sources.split(';'), self.variant_configs)
+        except Exception as e: messagebox.showerror("Error", str(e)); return
+        if not scenario_paths: messagebox.showerror("Error", lang["error_batch_no_match"]); return
+        selected_values = self._get_selected_values(); cross_product = self.cross_product_var.get(); per_scenario = count_variant_tasks(selected_values, cross_product)
+        if not per_scenario: print("--- No variants were selected. ---"); return
+        overwrite = messagebox.askyesnocancel(lang["dialog_batch_title"], lang["dialog_batch_confirm"].format(variants=per_scenario * len(scenario_paths), scenarios=len(scenario_paths)))
+        if overwrite is None: return
+        variant_configs = {key: {"tag_text": cfg['tag_text'], "suffix": cfg['suffix']} for key, cfg in self.variant_configs.items()}
+        results = queue.Queue(); summary = new_batch_summary(); summary["scenarios"] = len(scenario_paths); writer = VariantWriter(self.settings.get("fsync_policy", DEFAULT_FSYNC_POLICY)); metrics = RunMetrics("batch")
+        def run_batch():
+            # Worker thread: only talks to the UI through the queue
+            try:
+                for event in iter_batch_results(scenario_paths, selected_values, variant_configs, cross_product, overwrite=overwrite, writer=writer, metrics=metrics): results.put(event)
+                results.put(("stats", writer.finish()))
+            except Exception as e: results.put((None, "error", None, f"❌ Batch stopped: {e}"))
+            finally: results.put(None)
+        print(f"\n--- Starting Generation of {per_scenario * len(scenario_paths)} variants from {len(scenario_paths)} scenario(s) ---")
+        self.progress_bar['maximum'] = per_scenario * len(scenario_paths)
+        self.generation_state = {"queue": results, "summary": summary, "per_scenario": per_scenario, "done": 0, "created": [], "folder": folder_path, "metrics": metrics, "write_stats": None}
+        self.generate_button.config(state="disabled"); self.batch_button.config(state="disabled")
+        threading.Thread(target=run_batch, daemon=True).start()
+        self._poll_batch_generation()
+    def _poll_batch_generation(self):
+        state = self.generation_state; finished = False
+        try:
+            while True:
+                event = state["queue"].get_nowait()
+                if event is None: finished = True; break
+                if event[0] == "stats": state["write_stats"] = event[1]; continue
+                scenario_path, status, new_scenario_name, error_message = event; state["summary"][status] += 1
+                # A scenario that can't be used accounts for all of its variants at once
+                state["done"] += state["per_scenario"] if status in ("parse_error", "name_not_found") else 1
+                if status == "success":
+                    print(f"✅ Created: {new_scenario_name}.sce")
+                    if os.path.normcase(os.path.dirname(os.path.abspath(scenario_path))) == os.path.normcase(os.path.abspath(state["folder"])): state["created"].append(new_scenario_name)
+                elif status == "unchanged": print(f"⏩ Unchanged: {new_scenario_name}.sce")
+                elif status == "skipped": print(f"⏩ Skipped: {new_scenario_name}.sce")
+                elif status == "error_timelimit": print(f"❌ Cannot create duration variant '{new_scenario_name}' for a scenario with Timelimit=0.")
+                else: print(error_message)
+        except queue.Empty: pass
+        self.progress_bar['value'] = state["done"]
+        if not finished: self.root.after(GENERATION_POLL_MS, self._poll_batch_generation); return
+        self.generation_state = None; self.batch_button.config(state="normal")
+        if self.loaded_scenario_data: self.generate_button.config(state="normal")
+        state["metrics"].timed("refresh", self._add_created_scenarios, state["folder"], state["created"])
+        self._report_run_metrics(state["metrics"], state["write_stats"])
+        print(format_batch_summary(state["summary"]))
         self.progress_bar['value'] = 0
     def _toggle_edit_mode(self):
         self.is_edit_mode = not self.is_edit_mode
@@ -582,7 +710,7 @@ class VariantGeneratorApp:
     def _on_settings_change(self, *args):
         if not self.ui_ready: return
         active_profile = self.settings["profiles"][self.active_profile_name]
-        active_profile["folder_path"] = self.folder_path_var.get()
+        active_profile["folder_path"] = self.folder_path_var.get(); active_profile["cross_product"] = self.cross_product_var.get()
         active_profile["checkboxes"] = {key: var.get() for key, var in self.checkbox_vars.items()}
         try:
             for key, config in self.variant_configs.items():
@@ -600,6 +728,10 @@ class VariantGeneratorApp:
         if self.ui_ready:
             self._on_settings_change()
             save_settings(self.settings)
+            save_scenario_index(self.scenario_index)
+        # A rescan still running stops at its next batch (each batch is its own transaction, so the file stays consistent)
+        if self.scenario_catalog is not None: self.catalog_executor.shutdown(wait=False, cancel_futures=True); self.scenario_catalog.close()
+        sys.stdout = sys.__stdout__; sys.stderr = sys.__stderr__ # the log widget is going away with the window
         self.root.destroy()
 
 if __name__ == "__main__":
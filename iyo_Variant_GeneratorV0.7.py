@@ -1,37 +1,28 @@
 # iyo_Variant_Generator0.7.py (Version 19.11 - Simplified Timescale Handling)
 
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-from tkinter.simpledialog import askstring
-from tkinter import font
+import time
+_STARTUP_T0 = time.perf_counter()
 import os
-import re
 import json
 import sys
 # Co-developed with Gemini, a large language model from Google.
 
 # --- MASTER MODIFIER CONFIGURATION ---
-MODIFIER_CONFIG = {
-    "SIZE": { "display_name": "Size", "tag_text": "Size", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MainBBRadius"], "condition": None, "suffix": "%", "value_key": "percentages" },
-    "SPEED": { "display_name": "Speed", "tag_text": "Speed", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MaxSpeed", "MaxCrouchSpeed"], "condition": "value > 0", "suffix": "%", "value_key": "percentages" },
-    "TIMESCALE": { "display_name": "Timescale", "tag_text": "Timescale", "mod_type": "Multiplier", "scope": "Global", "properties": ["Timescale"], "condition": None, "suffix": "%", "value_key": "percentages" },
-    "DURATION": { "display_name": "Duration", "tag_text": "Dur", "mod_type": "Direct", "scope": "Global", "properties": ["Timelimit"], "condition": None, "suffix": "s", "value_key": "durations" },
-    "HP": { "display_name": "HP", "tag_text": "HP", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MaxHealth"], "condition": None, "suffix": "%", "value_key": "hp_percentages" },
-    "REGEN_RATE": { "display_name": "Regen", "tag_text": "Regen", "mod_type": "Calculated", "scope": "Character Profile", "properties": ["HealthRegenPerSec"], "calculation_base": "MaxHealth", "condition": None, "suffix": "%", "value_key": "regen_percentages" }
-}
+# The engine (parsing, naming, variant writing) is the shared variant_core package, the same one V0.8 uses.
+# This version's settings.json keeps one "percentages" list for Size/Speed/Timescale, so only value_key differs.
+from variant_core import (MODIFIER_CONFIG as CORE_MODIFIER_CONFIG, SETTINGS_FILE, DEFAULT_KOVAAKS_PATH, get_variant_name,
+                          parse_scenario_file, create_variant_file)
+MODIFIER_CONFIG = {key: dict(config, value_key="percentages" if key in ("SIZE", "SPEED", "TIMESCALE") else config['value_key']) for key, config in CORE_MODIFIER_CONFIG.items()}
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Any command-line arguments mean headless batch mode (see variant_core/cli.py) - Tk is never loaded for it
+    from variant_core.cli import main
+    sys.exit(main())
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from tkinter.simpledialog import askstring
+from tkinter import font
 
 # --- CORE LOGIC ---
-SETTINGS_FILE = "settings.json"
-DEFAULT_KOVAAKS_PATH = r"C:\Program Files (x86)\Steam\steamapps\common\FPSAimTrainer\FPSAimTrainer\Saved\SaveGames\Scenarios"
-
-def get_variant_tag(tag_text, suffix, value):
-    if suffix == "s": return f"{tag_text} {value}s"
-    else: return f"{tag_text} {value}%"
-def get_base_scenario_name(full_name, current_tags):
-    base_name = full_name
-    for tag in current_tags:
-        if f" {tag} " in base_name: base_name = base_name.split(f" {tag} ")[0]
-    return base_name.strip()
 def get_default_profile():
     profile = {
         "folder_path": DEFAULT_KOVAAKS_PATH,
@@ -67,123 +58,6 @@ def load_settings():
                 return {"last_active_profile": "Default", "profiles": {"Default": migrated_profile}}
     except (FileNotFoundError, json.JSONDecodeError):
         return {"last_active_profile": "Default", "profiles": {"Default": get_default_profile()}}
-def parse_scenario_file(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8-sig') as f: lines = f.readlines()
-    except Exception: return None
-    extracted_data = { "all_lines": lines, "scenario_name": "N/A", "player_profile_name": None, "character_profiles": {}, "global_properties": {} }
-    in_any_section = False
-    for line in lines:
-        if line.strip().startswith('['): in_any_section = True
-        if '=' not in line: continue
-        key_part, value_part = line.split('=', 1); key = key_part.strip().lower(); value = value_part.strip()
-        if key == "playercharacters": extracted_data["player_profile_name"] = value.split('.')[0]
-        if not in_any_section and key == "name": extracted_data["scenario_name"] = value
-        for mod_key, config in MODIFIER_CONFIG.items():
-            if config['scope'] == 'Global':
-                if not in_any_section:
-                    for prop in config['properties']:
-                        if key == prop.lower(): extracted_data['global_properties'][prop] = float(value)
-                if key == "scoreperhit": extracted_data['global_properties']["ScorePerHit"] = float(value)
-                elif key == "scoreperdamage": extracted_data['global_properties']["ScorePerDamage"] = float(value)
-                elif key == "scoreperkill": extracted_data['global_properties']["ScorePerKill"] = float(value)
-    current_profile_name = None; in_char_profile_section = False
-    for line in lines:
-        line_strip = line.strip()
-        if line_strip.lower() == "[character profile]": in_char_profile_section = True; current_profile_name = None; continue
-        if in_char_profile_section and line_strip.startswith('['): in_char_profile_section = False; current_profile_name = None; continue
-        if in_char_profile_section:
-            if '=' not in line_strip: continue
-            key, value = line_strip.split('=', 1); key, value = key.strip(), value.strip()
-            if key.lower() == "name":
-                current_profile_name = value
-                if current_profile_name not in extracted_data["character_profiles"]: extracted_data["character_profiles"][current_profile_name] = {}
-            if current_profile_name:
-                all_char_props = set()
-                for cfg in MODIFIER_CONFIG.values():
-                    if cfg['scope'] == 'Character Profile':
-                        all_char_props.update(cfg['properties'])
-                        if cfg.get('calculation_base'): all_char_props.add(cfg['calculation_base'])
-                if key in all_char_props:
-                    extracted_data["character_profiles"][current_profile_name][key] = float(value)
-    return extracted_data
-
-# --- SIMPLIFIED --- Removed `legacy_mode` parameter from the function definition
-def create_variant_file(base_data, folder_path, variant_type_key, new_value, variant_configs):
-    user_provided_name = base_data['user_provided_name'].strip(); internal_name_to_replace = base_data['scenario_name'].strip()
-    multiplier = new_value / 100.0; config = MODIFIER_CONFIG[variant_type_key.upper()]; ui_config = variant_configs[variant_type_key.upper()]
-    current_tags = [cfg['tag_text'] for cfg in variant_configs.values()]
-    clean_base_name = get_base_scenario_name(user_provided_name, current_tags)
-    variant_tag = get_variant_tag(ui_config['tag_text'], ui_config['suffix'], new_value); new_scenario_name = f"{clean_base_name} {variant_tag}"
-    new_filename = os.path.join(folder_path, new_scenario_name + ".sce")
-    lines = base_data["all_lines"][:]; found_name = False; current_profile_name = None; in_char_profile_section = False; in_any_section = False
-    player_name = base_data.get("player_profile_name")
-
-    v_key_upper = variant_type_key.upper()
-    
-    new_timelimit_value = 0
-    score_ratio = 1.0
-    if v_key_upper == "DURATION":
-        base_timelimit = base_data['global_properties'].get("Timelimit", 0)
-        base_timescale = base_data['global_properties'].get("Timescale", 1.0)
-        if base_timelimit <= 0: return "error_timelimit"
-        # --- SIMPLIFIED --- This logic is now the default. It correctly handles both modern and legacy scenarios.
-        if base_timescale > 0 and base_timescale != 1.0:
-            base_perceived_duration = base_timelimit / base_timescale
-            score_ratio = base_perceived_duration / new_value if new_value > 0 else 1.0
-            duration_multiplier = new_value / base_perceived_duration if base_perceived_duration > 0 else 1.0
-            new_timelimit_value = base_timelimit * duration_multiplier
-        else:
-            score_ratio = base_timelimit / new_value if new_value > 0 else 1.0
-            new_timelimit_value = float(new_value)
-
-    for i, line in enumerate(lines):
-        line_strip = line.strip()
-        if line_strip.startswith('['):
-            in_any_section = True
-            if line_strip.lower() == "[character profile]": in_char_profile_section = True; current_profile_name = None
-            else: in_char_profile_section = False
-            continue
-        if '=' not in line: continue
-        key_raw, value_raw = line.split('=', 1); key_strip = key_raw.strip(); key_lower = key_strip.lower()
-        if not in_any_section and key_lower == "name" and value_raw.strip().lower() == internal_name_to_replace.lower():
-            lines[i] = f"{key_strip}={new_scenario_name}\n"; found_name = True; continue
-        
-        if v_key_upper == "DURATION" and not in_any_section:
-            if key_lower == "timelimit": lines[i] = f"{key_strip}={new_timelimit_value:.1f}\n"
-            if key_lower == "scoreperhit" and base_data['global_properties'].get("ScorePerHit", 0) > 0: lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerHit'] * score_ratio:.3f}\n"
-            if key_lower == "scoreperdamage" and base_data['global_properties'].get("ScorePerDamage", 0) > 0: lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerDamage'] * score_ratio:.3f}\n"
-            if key_lower == "scoreperkill" and base_data['global_properties'].get("ScorePerKill", 0) > 0: lines[i] = f"{key_strip}={base_data['global_properties']['ScorePerKill'] * score_ratio:.3f}\n"
-        
-        elif v_key_upper == "TIMESCALE" and not in_any_section:
-            if key_lower in [p.lower() for p in config['properties']]:
-                base_val = base_data['global_properties'].get(key_strip, 1.0)
-                lines[i] = f"{key_strip}={base_val * multiplier:.3f}\n"
-            elif key_lower == "timelimit":
-                base_val = base_data['global_properties'].get("Timelimit", 0)
-                if base_val > 0:
-                    lines[i] = f"{key_strip}={base_val * multiplier:.1f}\n"
-
-        elif config['scope'] == 'Character Profile' and in_char_profile_section:
-            if key_lower == "name": current_profile_name = value_raw.strip()
-            if current_profile_name and current_profile_name != player_name:
-                if key_lower in [p.lower() for p in config['properties']]:
-                    if config['mod_type'] == 'Multiplier':
-                        base_val = base_data["character_profiles"].get(current_profile_name, {}).get(key_strip, 0); should_modify = not (config['condition'] == "value > 0" and not base_val > 0)
-                        if should_modify: lines[i] = f"{key_strip}={base_val * multiplier:.5f}\n"
-                    elif config['mod_type'] == 'Calculated':
-                        calc_base_prop = config['calculation_base']
-                        base_val = base_data["character_profiles"].get(current_profile_name, {}).get(calc_base_prop, 0)
-                        calculated_value = base_val * multiplier
-                        lines[i] = f"{key_strip}={calculated_value:.5f}\n"
-
-    if not found_name:
-        messagebox.showerror("Parsing Error", f"Could not find the name line in the file.\n\nLooking for: '{internal_name_to_replace}'"); return "name_not_found"
-    try:
-        with open(new_filename, 'w', encoding='utf-8') as f: f.writelines(lines)
-        print(f"✅ Created: {new_scenario_name}.sce"); return "success"
-    except Exception as e:
-        print(f"❌ ERROR creating {new_filename}: {e}"); return "error"
 
 # --- UI Application Classes ---
 class RedirectText:
@@ -210,11 +84,16 @@ class VariantGeneratorApp:
         default_font = font.nametofont("TkDefaultFont"); self.header_font = font.Font(family=default_font.cget("family"), size=default_font.cget("size")+2, weight="bold")
         # --- REMOVED --- self.legacy_timescale_var is no longer needed
         self._create_widgets()
+        self.folder_path_var.set(self.settings["profiles"][self.active_profile_name]["folder_path"])
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        # The variant columns and the scenario list are the slow part of startup; build them once the window is up
+        self.root.after_idle(self._finish_startup)
+    def _finish_startup(self):
+        window_shown_ms = (time.perf_counter() - _STARTUP_T0) * 1000
         self._load_profile(self.active_profile_name)
         self._populate_scenario_list()
         sys.stdout = RedirectText(self.log_widget); sys.stderr = RedirectText(self.log_widget)
-        print("Application started. Load a scenario to begin.")
-        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        print(f"Application started in {(time.perf_counter() - _STARTUP_T0) * 1000:.0f} ms (window shown after {window_shown_ms:.0f} ms). Load a scenario to begin.")
         self.ui_ready = True
 
     def _create_widgets(self):
@@ -363,7 +242,7 @@ class VariantGeneratorApp:
         for i, (vtype, val) in enumerate(tasks):
             should_create = True
             if overwrite_decision != 'yes_all':
-                user_provided_name = self.loaded_scenario_data['user_provided_name'].strip(); current_tags = [cfg['tag_text'] for cfg in self.variant_configs.values()]; clean_base_name = get_base_scenario_name(user_provided_name, current_tags); config = self.variant_configs[vtype.upper()]; variant_tag = get_variant_tag(config['tag_text'], config['suffix'], val); new_scenario_name = f"{clean_base_name} {variant_tag}"; new_filename = new_scenario_name + ".sce"
+                new_filename = get_variant_name(self.loaded_scenario_data, [(vtype, val)], self.variant_configs) + ".sce"
                 if os.path.exists(os.path.join(self.folder_path_var.get(), new_filename)):
                     if overwrite_decision == 'ask': dialog = OverwriteDialog(self.root, new_filename); overwrite_decision = dialog.result
                     if overwrite_decision == 'no_all': print("⏩ Skipping all remaining overwrites."); break
@@ -372,7 +251,7 @@ class VariantGeneratorApp:
                 # --- SIMPLIFIED --- Removed the legacy mode argument from the function call
                 result = create_variant_file(self.loaded_scenario_data, self.folder_path_var.get(), vtype, val, self.variant_configs)
                 if result == "success": created_count += 1
-                elif result == "name_not_found": break
+                elif result == "name_not_found": messagebox.showerror("Parsing Error", f"Could not find the name line in the file.\n\nLooking for: '{self.loaded_scenario_data['scenario_name'].strip()}'"); break
                 elif result == "error_timelimit": messagebox.showerror("Error", f"Cannot create duration variant for a scenario with Timelimit=0."); break
             self.progress_bar['value'] = i + 1; self.root.update_idletasks()
         print(f"--- Finished! Created {created_count} new files. ---"); self.progress_bar['value'] = 0
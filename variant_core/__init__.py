@@ -0,0 +1,19 @@
+# variant_core - the scenario parsing / variant generation engine shared by the front ends.
+# Nothing in here imports tkinter, so it can run headless (see cli.py, `python -m variant_core`).
+
+from .config import MODIFIER_CONFIG, SETTINGS_FILE, SCENARIO_INDEX_FILE, CATALOG_FILE, DEFAULT_KOVAAKS_PATH, GENERATION_WORKERS, GLOBAL_PROPERTIES, SCORE_PROPERTIES, CHARACTER_PROPERTIES
+from .naming import get_variant_value, get_variant_tag, get_base_scenario_name, apply_variant_tag, ScenarioName
+from .settings import get_default_profile, save_settings, load_settings
+from .folder_index import load_scenario_index, save_scenario_index, refresh_folder_index, record_created_scenarios
+from .search import ScenarioSearch, SEARCH_RESULT_LIMIT
+from .records import ScenarioLines, ProfileStats
+from .writer import write_file_atomic, write_chunks_atomic, VariantWriter, FSYNC_POLICIES, DEFAULT_FSYNC_POLICY
+from .metrics import RunMetrics, PHASES, format_run_summary, append_run_metrics
+from .scenario import (parse_scenario_file, compile_variant_template, compile_variant_slots, get_compiled_segments, get_variant_template, apply_modifiers, get_scenario_name_model, get_combined_variant_name, is_base_scenario_name, sort_modifiers, get_variant_name,
+                       format_slot_value, render_combined_variant, render_variant, generate_combined_variant, generate_variant, create_variant_file)
+from .mapped import scan_scenario_file, get_splice_slots, get_variant_edits, splice_file, generate_spliced_variant
+from .tasks import iter_variant_tasks, count_variant_tasks, imap_bounded
+from .plan import snapshot_folder, scan_conflicts, get_variant_changes, iter_variant_plan, format_plan_entry, export_plan
+from .catalog import ScenarioCatalog, parse_catalog_query, format_catalog_stats
+from .scenario_cache import ScenarioCache, SCENARIO_CACHE_MAX_MB
+from .batch import SCENARIO_READERS, DEFAULT_SCENARIO_READER, load_playlist_scenarios, split_generated_tags, resolve_batch_scenarios, iter_batch_results, iter_batch_plan, new_batch_summary, format_batch_summary
@@ -0,0 +1,9 @@
+import sys
+
+if sys.argv[1:2] == ["catalog"]:
+    # python -m variant_core catalog ... - query the scenario catalog (see catalog.py)
+    from .catalog import main
+    sys.exit(main(sys.argv[2:]))
+from .cli import main
+
+sys.exit(main())
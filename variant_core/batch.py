@@ -0,0 +1,131 @@
+# variant_core/batch.py - the same variant set for many base scenarios at once
+#
+# Base scenarios are parsed in parallel a few ahead of the writer, and every variant of every scenario is
+# streamed through one shared pool, so a pack of 100+ scenarios is a single run with one progress count.
+
+import fnmatch
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from .config import GENERATION_WORKERS
+from .naming import ScenarioName, get_variant_value
+from .scenario import parse_scenario_file, get_variant_template, generate_combined_variant, get_variant_name
+from .mapped import scan_scenario_file, get_splice_slots, generate_spliced_variant
+from .tasks import iter_variant_tasks, imap_bounded
+from .plan import iter_variant_plan
+
+# How base scenarios are read and variants written: (load, compile, generate). "text" decodes the whole file and
+# renders each variant as text; "mmap" scans the mapped bytes and splices the new values into the source bytes.
+SCENARIO_READERS = {"text": (parse_scenario_file, get_variant_template, generate_combined_variant), "mmap": (scan_scenario_file, get_splice_slots, generate_spliced_variant)}
+DEFAULT_SCENARIO_READER = "text"
+
+def load_playlist_scenarios(playlist_path):
+    # KovaaK's playlist files: {"playlistName": ..., "scenarioList": [{"scenario_name": ..., "play_Count": ...}, ...]}
+    with open(playlist_path, 'r', encoding='utf-8-sig') as f: playlist = json.load(f)
+    return [entry["scenario_name"] for entry in playlist.get("scenarioList", []) if entry.get("scenario_name")]
+def _name_key(name): return " ".join(name.split()).lower()
+def split_generated_tags(name, variant_configs):
+    # "VT Pasu Speed Track Size 80%" -> (ScenarioName "VT Pasu" + [("Speed", "Track")], 1): the name without its
+    # trailing tags that carry a value this tool writes ("Size 80%", "Dur 30s"), and how many there were. Tag words
+    # that are part of a real scenario's name ("Speed Track", "HP Goated") stay in the name.
+    suffixes = {config['tag_text']: get_variant_value(config['suffix'], "") for config in variant_configs.values()}
+    scenario_name = ScenarioName.parse(name, tuple(suffixes)); tags = scenario_name.tags; kept = len(tags)
+    while kept and re.fullmatch(r"\d+" + re.escape(suffixes[tags[kept - 1][0]]), tags[kept - 1][1]): kept -= 1
+    return ScenarioName(scenario_name.base, tags[:kept]), len(tags) - kept
+def resolve_batch_scenarios(folder, sources, variant_configs=None):
+    # sources: scenario names, wildcard patterns over the folder ("VT *"), .sce paths or playlist .json files.
+    # Returns .sce paths in the given order without duplicates; missing files surface later as parse errors.
+    # With variant_configs, a wildcard leaves out the variants generated last time ("VT X Size 80%") so a pattern
+    # picks the base scenarios only; the names it leaves out are printed.
+    scenario_paths = []; seen = set(); folder_names = None
+    def add(path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen: seen.add(key); scenario_paths.append(path)
+    for source in sources:
+        source = source.strip()
+        if not source: continue
+        if source.lower().endswith(".json"):
+            for name in load_playlist_scenarios(source): add(os.path.join(folder, name + ".sce"))
+        elif source.lower().endswith(".sce") and os.path.isfile(source): add(source)
+        elif any(char in source for char in "*?["):
+            if folder_names is None:
+                folder_names = sorted((filename[:-4] for filename in os.listdir(folder) if filename.lower().endswith(".sce")), key=str.lower); folder_keys = {_name_key(name) for name in folder_names}
+            excluded = []
+            for name in folder_names:
+                if not fnmatch.fnmatchcase(name.lower(), source.lower()): continue
+                if variant_configs:
+                    # A variant: only generated tags after the base, or another scenario of the folder plus generated tags
+                    base_name, generated = split_generated_tags(name, variant_configs)
+                    if generated and (not base_name.tags or _name_key(str(base_name)) in folder_keys): excluded.append(name); continue
+                add(os.path.join(folder, name + ".sce"))
+            if excluded: print(f"⏩ '{source}' left out {len(excluded)} generated variants: {', '.join(excluded)}")
+        else: add(os.path.join(folder, source + ".sce"))
+    return scenario_paths
+def _target_key(folder, scenario_name): return os.path.normcase(os.path.abspath(os.path.join(folder, scenario_name + ".sce")))
+def find_batch_collisions(scenario_paths, selected_values, variant_configs, cross_product=False, out_folder=None):
+    # Output names depend only on the base's file name, so every target of the run is known before anything is parsed.
+    # Returns {(scenario_path, modifiers): error_message} for variants that must not be written: a target another base
+    # of the batch also produces (the first base in order keeps it), or a target that is itself one of the bases.
+    # A variant keeps its base's tag-stripped name, so only bases sharing one (in the same output folder) can collide;
+    # just those groups are enumerated, and every other base's targets are never held in memory.
+    current_tags = tuple(config['tag_text'] for config in variant_configs.values()); groups = {}
+    for scenario_path in scenario_paths:
+        target_folder = out_folder or os.path.dirname(os.path.abspath(scenario_path))
+        base_name = ScenarioName.parse(os.path.basename(scenario_path)[:-4], current_tags).base
+        groups.setdefault((os.path.normcase(os.path.abspath(target_folder)), _name_key(base_name)), []).append(scenario_path)
+    collisions = {}
+    for group in groups.values():
+        if len(group) < 2: continue
+        bases = {_target_key(os.path.dirname(os.path.abspath(path)), os.path.basename(path)[:-4]): path for path in group}; owners = {}
+        for scenario_path in group:
+            name_data = {"user_provided_name": os.path.basename(scenario_path)[:-4]}; target_folder = out_folder or os.path.dirname(os.path.abspath(scenario_path))
+            for modifiers in iter_variant_tasks(selected_values, cross_product):
+                new_scenario_name = get_variant_name(name_data, modifiers, variant_configs); target = _target_key(target_folder, new_scenario_name)
+                if target in bases and bases[target] != scenario_path: collisions[(scenario_path, modifiers)] = f"❌ Not creating '{new_scenario_name}.sce': it is one of the batch's base scenarios."
+                elif owners.setdefault(target, scenario_path) != scenario_path: collisions[(scenario_path, modifiers)] = f"❌ Not creating '{new_scenario_name}.sce' from '{os.path.basename(scenario_path)}': '{os.path.basename(owners[target])}' already produces it."
+    return collisions
+def _load_batch_scenario(scenario_path, reader=DEFAULT_SCENARIO_READER):
+    load, compile_template, generate = SCENARIO_READERS[reader]
+    base_data = load(scenario_path)
+    if base_data:
+        base_data["user_provided_name"] = os.path.basename(scenario_path)[:-4]
+        compile_template(base_data) # compiled here, on the pool, instead of racing in the first writers
+    return scenario_path, base_data
+def iter_batch_results(scenario_paths, selected_values, variant_configs, cross_product=False, out_folder=None, overwrite=False, workers=GENERATION_WORKERS, writer=None, metrics=None,
+                       reader=DEFAULT_SCENARIO_READER):
+    # Yields (scenario_path, status, new_scenario_name, error_message) for every variant of every scenario;
+    # status is one of success / unchanged / skipped / error / error_timelimit, or name_not_found / parse_error once per
+    # scenario that can't be used. Variants are written next to their base scenario unless out_folder is given.
+    load, compile_template, generate = SCENARIO_READERS[reader]
+    collisions = find_batch_collisions(scenario_paths, selected_values, variant_configs, cross_product, out_folder)
+    load_scenario = (lambda scenario_path: metrics.timed("parse", _load_batch_scenario, scenario_path, reader)) if metrics else (lambda scenario_path: _load_batch_scenario(scenario_path, reader))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def jobs():
+            for scenario_path, base_data in imap_bounded(executor, load_scenario, scenario_paths, workers):
+                if base_data is None: yield scenario_path, "parse_error", None; continue
+                if not compile_template(base_data)["name_found"]: yield scenario_path, "name_not_found", base_data; continue
+                for modifiers in iter_variant_tasks(selected_values, cross_product): yield scenario_path, modifiers, base_data
+        def run_job(job):
+            scenario_path, modifiers, base_data = job
+            if modifiers == "parse_error": return scenario_path, "parse_error", None, f"❌ Could not read or parse '{scenario_path}'."
+            if modifiers == "name_not_found": return scenario_path, "name_not_found", None, f"❌ Could not find the name line in '{scenario_path}'. Looking for: '{base_data['scenario_name'].strip()}'"
+            if (scenario_path, modifiers) in collisions: return scenario_path, "error", get_variant_name(base_data, modifiers, variant_configs), collisions[(scenario_path, modifiers)]
+            target_folder = out_folder or os.path.dirname(os.path.abspath(scenario_path))
+            return (scenario_path,) + generate(base_data, target_folder, modifiers, variant_configs, skip_existing=not overwrite, writer=writer, metrics=metrics)
+        yield from imap_bounded(executor, run_job, jobs(), workers * 4)
+def iter_batch_plan(scenario_paths, selected_values, variant_configs, cross_product=False, out_folder=None):
+    # Dry run of iter_batch_results: plan entries for every variant of every scenario, nothing is written
+    collisions = find_batch_collisions(scenario_paths, selected_values, variant_configs, cross_product, out_folder)
+    for scenario_path in scenario_paths:
+        scenario_path, base_data = _load_batch_scenario(scenario_path)
+        if not base_data: yield {"scenario": os.path.basename(scenario_path)[:-4], "file": None, "status": "parse_error", "exists": False, "modifiers": {}, "changes": []}; continue
+        tasks = list(iter_variant_tasks(selected_values, cross_product))
+        for modifiers, entry in zip(tasks, iter_variant_plan(base_data, out_folder or os.path.dirname(os.path.abspath(scenario_path)), tasks, variant_configs)):
+            if (scenario_path, modifiers) in collisions: entry["status"] = "error"
+            yield entry
+def new_batch_summary(): return {"scenarios": 0, "success": 0, "unchanged": 0, "skipped": 0, "error": 0, "error_timelimit": 0, "name_not_found": 0, "parse_error": 0}
+def format_batch_summary(summary):
+    failed_scenarios = summary["parse_error"] + summary["name_not_found"]
+    return (f"--- Finished! Created {summary['success']} new files from {summary['scenarios'] - failed_scenarios} of {summary['scenarios']} scenarios "
+            f"({summary['unchanged']} unchanged, {summary['skipped']} skipped, {summary['error'] + summary['error_timelimit']} failed). ---")
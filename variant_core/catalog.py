@@ -0,0 +1,188 @@
+# variant_core/catalog.py - SQLite catalog of the scenarios in a Scenarios folder
+#
+# scenario_catalog.sqlite (beside settings.json) holds, per .sce file, the values a variant works with:
+# Timelimit/Timescale/ScorePer*, every character profile's size/speed/health values, the player profile and
+# the base name + variant tags the file name carries. refresh() rescans only files whose (mtime, size)
+# moved, using the memory-mapped scanner, so questions like "Timelimit=60 with more than one bot" are a
+# query instead of a parse of every file:
+#
+#   python -m variant_core catalog --folder "C:\...\Scenarios" timelimit=60 "bots>1"
+#   python -m variant_core catalog --folder "C:\...\Scenarios" tag=Size radius<20 --stats
+
+import argparse
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import MODIFIER_CONFIG, CATALOG_FILE, GENERATION_WORKERS, GLOBAL_PROPERTIES, SCORE_PROPERTIES, CHARACTER_PROPERTIES
+from .naming import ScenarioName
+from .mapped import scan_scenario_file
+from .records import ProfileStats
+from .tasks import imap_bounded
+
+CATALOG_VERSION = 1 # stored as PRAGMA user_version; a different version rebuilds the catalog
+CATALOG_COMMIT_ROWS = 500
+GLOBAL_COLUMNS = sorted(set(GLOBAL_PROPERTIES.values()) | set(SCORE_PROPERTIES.values()))
+PROFILE_COLUMNS = sorted(CHARACTER_PROPERTIES)
+CATALOG_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scenarios (folder TEXT NOT NULL, name TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, status TEXT NOT NULL,
+    scenario_name TEXT, base_name TEXT, player_profile TEXT, bot_count INTEGER, {", ".join(f"{column} REAL" for column in GLOBAL_COLUMNS)}, PRIMARY KEY (folder, name));
+CREATE TABLE IF NOT EXISTS profiles (folder TEXT NOT NULL, name TEXT NOT NULL, profile TEXT NOT NULL, is_player INTEGER NOT NULL,
+    {", ".join(f"{column} REAL" for column in PROFILE_COLUMNS)}, PRIMARY KEY (folder, name, profile));
+CREATE TABLE IF NOT EXISTS tags (folder TEXT NOT NULL, name TEXT NOT NULL, position INTEGER NOT NULL, tag_text TEXT NOT NULL, value_text TEXT NOT NULL, PRIMARY KEY (folder, name, position));
+CREATE INDEX IF NOT EXISTS tags_by_text ON tags (folder, tag_text COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+# Filter names -> column. Profile columns match when any bot (a character profile other than the player's) matches.
+SCENARIO_FILTERS = {"bots": "bot_count", "base": "base_name", "player": "player_profile", "duration": "Timelimit", **{column.lower(): column for column in GLOBAL_COLUMNS}}
+PROFILE_FILTERS = {"radius": "MainBBRadius", "size": "MainBBRadius", "speed": "MaxSpeed", "hp": "MaxHealth", "health": "MaxHealth", "regen": "HealthRegenPerSec", **{column.lower(): column for column in PROFILE_COLUMNS}}
+TEXT_FILTERS = {"base", "player", "tag"}
+FILTER_OPERATORS = ("<=", ">=", "!=", "=", "<", ">")
+FILTER_PATTERN = re.compile(r'(?<!\S)(\w+)\s*(<=|>=|!=|=|<|>)\s*("[^"]*"|\S+)')
+
+def _folder_key(folder): return os.path.normcase(os.path.abspath(folder))
+def parse_catalog_query(query):
+    # "Timelimit=60 bots>1 air" -> ([("timelimit", "=", "60"), ("bots", ">", "1")], "air"). Only known filter names
+    # are taken out; everything else stays in the text part (for the name search).
+    filters = []
+    def take(match):
+        name = match.group(1).lower()
+        if name not in SCENARIO_FILTERS and name not in PROFILE_FILTERS and name != "tag": return match.group(0)
+        filters.append((name, match.group(2), match.group(3).strip('"'))); return ""
+    text = FILTER_PATTERN.sub(take, query)
+    return filters, " ".join(text.split())
+def _filter_clause(name, operator, value):
+    # One (sql, parameters) WHERE clause; raises ValueError for an unknown name, operator or non-numeric value
+    if operator not in FILTER_OPERATORS: raise ValueError(f"unknown operator '{operator}'")
+    if name in TEXT_FILTERS:
+        if operator not in ("=", "!="): raise ValueError(f"'{name}' only supports = and !=")
+        if name == "tag": return f"{'NOT ' if operator == '!=' else ''}EXISTS (SELECT 1 FROM tags t WHERE t.folder = s.folder AND t.name = s.name AND t.tag_text = ? COLLATE NOCASE)", [value]
+        return f"s.{SCENARIO_FILTERS[name]} {operator} ? COLLATE NOCASE", [value]
+    try: number = float(value.rstrip("%s"))
+    except ValueError: raise ValueError(f"'{name}' needs a number, got '{value}'")
+    if name in SCENARIO_FILTERS: return f"s.{SCENARIO_FILTERS[name]} {operator} ?", [number]
+    if name in PROFILE_FILTERS: return f"EXISTS (SELECT 1 FROM profiles p WHERE p.folder = s.folder AND p.name = s.name AND NOT p.is_player AND p.{PROFILE_FILTERS[name]} {operator} ?)", [number]
+    raise ValueError(f"unknown filter '{name}'")
+def _scan_catalog_entry(job):
+    name, path, stamp = job
+    return name, stamp, scan_scenario_file(path)
+class ScenarioCatalog:
+    def __init__(self, path=CATALOG_FILE):
+        # One connection shared by the GUI's worker and main threads, so every use goes through the lock
+        self.path = path; self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+                for table in ("scenarios", "profiles", "tags", "meta"): self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+                self._connection.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+            self._connection.executescript(CATALOG_SCHEMA)
+    def close(self):
+        with self._lock: self._connection.close()
+    def refresh(self, folder, current_tags=None, workers=GENERATION_WORKERS):
+        # Brings the folder's rows up to date; returns {"files", "updated", "removed", "seconds"}
+        started = time.perf_counter(); folder_key = _folder_key(folder)
+        current_tags = tuple(current_tags) if current_tags is not None else tuple(config['tag_text'] for config in MODIFIER_CONFIG.values())
+        on_disk = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".sce"): continue
+                try: stat = entry.stat()
+                except OSError: continue
+                on_disk[entry.name[:-4]] = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            stored = {name: (mtime_ns, size) for name, mtime_ns, size in self._connection.execute("SELECT name, mtime_ns, size FROM scenarios WHERE folder = ?", (folder_key,))}
+            tags_key = f"tags:{folder_key}"; row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (tags_key,)).fetchone()
+            retag = row is not None and row[0] != "\t".join(current_tags)
+        removed = [name for name in stored if name not in on_disk]
+        changed = [(name, os.path.join(folder, name + ".sce"), stamp) for name, stamp in on_disk.items() if stored.get(name) != stamp]
+        with self._lock, self._connection:
+            for name in removed: self._delete(folder_key, name)
+        # Files are scanned on the pool and written in batches of CATALOG_COMMIT_ROWS, so find() isn't locked out for a whole rescan
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = imap_bounded(executor, _scan_catalog_entry, changed, workers * 4)
+            while True:
+                batch = list(itertools.islice(results, CATALOG_COMMIT_ROWS))
+                if not batch: break
+                with self._lock, self._connection:
+                    for name, stamp, scanned in batch: self._delete(folder_key, name); self._insert(folder_key, name, stamp, scanned, current_tags)
+        with self._lock, self._connection:
+            if retag:
+                # The tag texts changed in the settings: the base names and tags are re-read from the file names, no file is opened
+                self._connection.execute("DELETE FROM tags WHERE folder = ?", (folder_key,))
+                for (name,) in self._connection.execute("SELECT name FROM scenarios WHERE folder = ?", (folder_key,)).fetchall(): self._insert_name(folder_key, name, current_tags)
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (tags_key, "\t".join(current_tags)))
+        return {"files": len(on_disk), "updated": len(changed), "removed": len(removed), "seconds": time.perf_counter() - started}
+    def _delete(self, folder_key, name):
+        for table in ("scenarios", "profiles", "tags"): self._connection.execute(f"DELETE FROM {table} WHERE folder = ? AND name = ?", (folder_key, name))
+    def _insert(self, folder_key, name, stamp, scanned, current_tags):
+        if scanned is None:
+            self._connection.execute("INSERT INTO scenarios (folder, name, mtime_ns, size, status) VALUES (?, ?, ?, ?, 'parse_error')", (folder_key, name) + stamp); return
+        player_name = scanned["player_profile_name"]; profiles = scanned["character_profiles"]
+        self._connection.execute(f"INSERT INTO scenarios (folder, name, mtime_ns, size, status, scenario_name, player_profile, bot_count, {', '.join(GLOBAL_COLUMNS)}) VALUES (?, ?, ?, ?, 'ok', ?, ?, ?{', ?' * len(GLOBAL_COLUMNS)})",
+                                 (folder_key, name) + stamp + (scanned["scenario_name"], player_name, sum(1 for profile in profiles if profile != player_name)) + tuple(scanned["global_properties"].get(column) for column in GLOBAL_COLUMNS))
+        self._connection.executemany(f"INSERT OR REPLACE INTO profiles (folder, name, profile, is_player, {', '.join(PROFILE_COLUMNS)}) VALUES (?, ?, ?, ?{', ?' * len(PROFILE_COLUMNS)})",
+                                     [(folder_key, name, profile, profile == player_name) + tuple(props.get(column) for column in PROFILE_COLUMNS) for profile, props in profiles.items()])
+        self._insert_name(folder_key, name, current_tags)
+    def _insert_name(self, folder_key, name, current_tags):
+        # Base name and tags as get_base_scenario_name / ScenarioName see the file name
+        scenario_name = ScenarioName.parse(name, current_tags)
+        self._connection.execute("UPDATE scenarios SET base_name = ? WHERE folder = ? AND name = ?", (scenario_name.base, folder_key, name))
+        self._connection.executemany("INSERT INTO tags (folder, name, position, tag_text, value_text) VALUES (?, ?, ?, ?, ?)", [(folder_key, name, position, tag_text, value_text) for position, (tag_text, value_text) in enumerate(scenario_name.tags)])
+    def find(self, folder, filters):
+        # Names of the folder's scenarios matching every (name, operator, value) filter, as parse_catalog_query returns them
+        clauses = ["s.folder = ?", "s.status = 'ok'"]; parameters = [_folder_key(folder)]
+        for name, operator, value in filters:
+            clause, clause_parameters = _filter_clause(name, operator, value); clauses.append(clause); parameters.extend(clause_parameters)
+        with self._lock: return [name for (name,) in self._connection.execute(f"SELECT s.name FROM scenarios s WHERE {' AND '.join(clauses)} ORDER BY s.name COLLATE NOCASE", parameters)]
+    def get_stats(self, folder, name):
+        # The catalogued values in parse_scenario_file's shape (no lines), or None when the file isn't catalogued or is out of date
+        folder_key = _folder_key(folder)
+        try: stat = os.stat(os.path.join(folder, name + ".sce"))
+        except OSError: return None
+        with self._lock:
+            row = self._connection.execute(f"SELECT mtime_ns, size, status, scenario_name, player_profile, {', '.join(GLOBAL_COLUMNS)} FROM scenarios WHERE folder = ? AND name = ?", (folder_key, name)).fetchone()
+            if row is None or (row[0], row[1]) != (stat.st_mtime_ns, stat.st_size) or row[2] != "ok": return None
+            profiles = self._connection.execute(f"SELECT profile, {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE folder = ? AND name = ? ORDER BY rowid", (folder_key, name)).fetchall()
+        character_profiles = {} # rowid order is the file's profile order, so the first bot is the same one the parse finds first
+        for profile, *values in profiles:
+            props = character_profiles[profile] = ProfileStats()
+            for column, value in zip(PROFILE_COLUMNS, values):
+                if value is not None: props[column] = value
+        return {"scenario_name": row[3], "player_profile_name": row[4], "character_profiles": character_profiles,
+                "global_properties": {column: value for column, value in zip(GLOBAL_COLUMNS, row[5:]) if value is not None}}
+def format_catalog_stats(stats):
+    # One line per scenario for the CLI: "Timelimit 60.0, Timescale 1.0 | Bot: MainBBRadius 25.0, MaxHealth 100.0"
+    player_name = stats["player_profile_name"]
+    parts = [", ".join(f"{key} {value}" for key, value in stats["global_properties"].items())]
+    parts += [f"{profile}: " + ", ".join(f"{key} {value}" for key, value in props.items()) for profile, props in stats["character_profiles"].items() if profile != player_name]
+    return " | ".join(parts)
+def main(argv=None):
+    from .settings import load_settings
+    parser = argparse.ArgumentParser(prog="variant_core catalog", description="Query the scenario catalog (refreshed first).")
+    parser.add_argument("query", nargs="*", help=f"filters like timelimit=60 \"bots>1\" tag=Size radius<20 (names: {', '.join(sorted(set(SCENARIO_FILTERS) | set(PROFILE_FILTERS) | {'tag'}))}); other words must appear in the name")
+    parser.add_argument("--folder", help="Scenarios folder (default: the settings profile's folder)")
+    parser.add_argument("--profile", help="settings profile to take the folder and tag texts from")
+    parser.add_argument("--catalog", default=CATALOG_FILE, help="catalog database file")
+    parser.add_argument("--stats", action="store_true", help="print each match's values too")
+    args = parser.parse_args(argv)
+    settings = load_settings(); profile = settings["profiles"].get(args.profile or settings["last_active_profile"])
+    if profile is None: print(f"❌ Unknown settings profile: {args.profile}"); return 2
+    folder = args.folder or profile["folder_path"]
+    if not os.path.isdir(folder): print(f"❌ Not a folder: {folder}"); return 1
+    filters, text = parse_catalog_query(" ".join(args.query))
+    catalog = ScenarioCatalog(args.catalog)
+    try:
+        refresh = catalog.refresh(folder, [profile.get("variant_tags", {}).get(key, config['tag_text']) for key, config in MODIFIER_CONFIG.items()])
+        print(f"Catalog: {refresh['files']} scenarios, {refresh['updated']} rescanned, {refresh['removed']} removed ({refresh['seconds'] * 1000:.0f} ms)")
+        try: names = catalog.find(folder, filters)
+        except ValueError as e: print(f"❌ {e}"); return 2
+        names = [name for name in names if all(word in name.lower() for word in text.lower().split())]
+        for name in names:
+            stats = catalog.get_stats(folder, name) if args.stats else None
+            print(f"{name}  -  {format_catalog_stats(stats)}" if stats else name)
+        print(f"--- {len(names)} matching scenarios. ---")
+    finally: catalog.close()
+    return 0
@@ -0,0 +1,85 @@
+# variant_core/cli.py - headless batch mode
+#
+#   python -m variant_core --scenario "C:\...\Scenarios\1w4ts.sce" --modifier SIZE=50,80,120 --modifier DURATION=30
+#   python -m variant_core --folder "C:\...\Scenarios" --scenario 1w4ts --out ./pack --overwrite
+#   python -m variant_core --scenario 1w4ts.sce --modifier SIZE=80,120 --modifier SPEED=80,120 --cross   (4 files, Size x Speed)
+#   python -m variant_core --folder "C:\...\Scenarios" --scenario "VT *" --scenario Benchmarks.json --modifier SIZE=80
+#
+# Without --modifier the checked values of the settings profile (--profile, default: last active) are used,
+# exactly like pressing "Generate Variants" in the GUI.
+
+import argparse
+import os
+from .config import MODIFIER_CONFIG
+from .settings import load_settings
+from .tasks import count_variant_tasks
+from .writer import VariantWriter, FSYNC_POLICIES, DEFAULT_FSYNC_POLICY
+from .metrics import RunMetrics, format_run_summary, append_run_metrics
+from .plan import format_plan_entry, export_plan
+from .batch import SCENARIO_READERS, DEFAULT_SCENARIO_READER, resolve_batch_scenarios, iter_batch_results, iter_batch_plan, new_batch_summary, format_batch_summary
+
+def parse_modifier_arg(text):
+    # "SIZE=50,80,120" -> ("SIZE", [50, 80, 120])
+    key, sep, values = text.partition('=')
+    key = key.strip().upper()
+    if not sep or key not in MODIFIER_CONFIG: raise argparse.ArgumentTypeError(f"expected KEY=v1,v2,... with KEY one of {', '.join(MODIFIER_CONFIG)}")
+    try: return key, [int(v) for v in values.split(',') if v.strip()]
+    except ValueError: raise argparse.ArgumentTypeError(f"values for {key} must be whole numbers")
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="variant_core", description="Generate KovaaK's scenario variants without the GUI.")
+    parser.add_argument("--scenario", action="append", required=True, help="a .sce path, a scenario name or wildcard pattern inside --folder, or a playlist .json; repeatable")
+    parser.add_argument("--folder", help="Scenarios folder for names and patterns (default: the profile's folder)")
+    parser.add_argument("--modifier", action="append", type=parse_modifier_arg, default=[], metavar="KEY=v1,v2", help=f"values to generate, KEY one of {', '.join(MODIFIER_CONFIG)}; repeatable")
+    parser.add_argument("--out", help="output folder (default: next to each base scenario)")
+    parser.add_argument("--profile", help="settings profile to take tags (and default values) from")
+    parser.add_argument("--cross", action="store_true", help="combine the selected values of different modifiers (cross-product) into one file each")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default=DEFAULT_FSYNC_POLICY, help="flush files to disk: once at the end (batch), per file (each) or never (none)")
+    parser.add_argument("--reader", choices=SCENARIO_READERS, default=DEFAULT_SCENARIO_READER, help="text: decode and rewrite whole files; mmap: scan the mapped bytes and splice only the changed values into a copy of the source bytes")
+    parser.add_argument("--dry-run", action="store_true", help="only list the files and changed values the run would produce; nothing is written")
+    parser.add_argument("--plan-out", help="with --dry-run: also export the plan to this .json or .csv file")
+    parser.add_argument("--metrics", help="append the run's timing summary as one JSON line to this file")
+    parser.add_argument("--overwrite", action="store_true", help="replace existing files instead of skipping them")
+    return parser
+def get_profile_variant_configs(profile):
+    variant_configs = {}
+    for key, config in MODIFIER_CONFIG.items():
+        values = profile.get(config['value_key'], [])
+        checked = [value for i, value in enumerate(values) if profile.get("checkboxes", {}).get(f"{key}_{i}", False)]
+        variant_configs[key] = {"values": checked, "suffix": config['suffix'], "tag_text": profile.get("variant_tags", {}).get(key, config['tag_text'])}
+    return variant_configs
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    settings = load_settings(); profile_name = args.profile or settings["last_active_profile"]
+    if profile_name not in settings["profiles"]: print(f"❌ Unknown settings profile: {profile_name}"); return 2
+    variant_configs = get_profile_variant_configs(settings["profiles"][profile_name])
+    if args.modifier:
+        for config in variant_configs.values(): config["values"] = []
+        for key, values in args.modifier: variant_configs[key]["values"] = values
+    folder = args.folder or settings["profiles"][profile_name]["folder_path"]
+    scenario_paths = resolve_batch_scenarios(folder, args.scenario, variant_configs)
+    if not scenario_paths: print("❌ No scenarios matched."); return 1
+    if args.out: os.makedirs(args.out, exist_ok=True)
+    selected_values = {key: config["values"] for key, config in variant_configs.items()}
+    per_scenario = count_variant_tasks(selected_values, args.cross)
+    if not per_scenario: print("--- No variants were selected. ---"); return 0
+    if args.dry_run:
+        entries = list(iter_batch_plan(scenario_paths, selected_values, variant_configs, args.cross, args.out))
+        for entry in entries: print(format_plan_entry(entry) if entry["file"] else f"❌ Could not read or parse '{entry['scenario']}.sce'.")
+        print(f"--- Dry run: {len(entries)} variants planned, nothing was written. ---")
+        if args.plan_out: print(f"✅ Exported plan of {export_plan(entries, args.plan_out)} variants: {args.plan_out}")
+        return 0
+    summary = new_batch_summary(); summary["scenarios"] = len(scenario_paths)
+    print(f"--- Starting Generation of {per_scenario * len(scenario_paths)} variants from {len(scenario_paths)} scenario(s) ---")
+    writer = VariantWriter(args.fsync); metrics = RunMetrics("cli")
+    for scenario_path, status, new_scenario_name, error_message in iter_batch_results(scenario_paths, selected_values, variant_configs, args.cross, args.out, args.overwrite, writer=writer, metrics=metrics, reader=args.reader):
+        summary[status] += 1
+        if status == "success": print(f"✅ Created: {new_scenario_name}.sce")
+        elif status == "unchanged": print(f"⏩ Unchanged: {new_scenario_name}.sce")
+        elif status == "skipped": print(f"⏩ Skipped: {new_scenario_name}.sce")
+        elif status == "error_timelimit": print(f"❌ Cannot create duration variant '{new_scenario_name}' for a scenario with Timelimit=0.")
+        else: print(error_message)
+    run_summary = metrics.finish(writer.finish())
+    print(format_run_summary(run_summary))
+    if args.metrics: append_run_metrics(args.metrics, run_summary)
+    print(format_batch_summary(summary))
+    return 1 if summary["error"] + summary["error_timelimit"] + summary["parse_error"] + summary["name_not_found"] else 0
@@ -0,0 +1,25 @@
+# variant_core/config.py - modifier definitions and shared constants (no UI imports)
+
+import os
+
+# --- MASTER MODIFIER CONFIGURATION ---
+# --- FIX 2: Unique value_key for each modifier to prevent data bleeding ---
+MODIFIER_CONFIG = {
+    "SIZE": { "display_name": "Size", "tag_text": "Size", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MainBBRadius"], "condition": None, "suffix": "%", "value_key": "size_percentages" },
+    "SPEED": { "display_name": "Speed", "tag_text": "Speed", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MaxSpeed", "MaxCrouchSpeed"], "condition": "value > 0", "suffix": "%", "value_key": "speed_percentages" },
+    "TIMESCALE": { "display_name": "Timescale", "tag_text": "Timescale", "mod_type": "Multiplier", "scope": "Global", "properties": ["Timescale"], "condition": None, "suffix": "%", "value_key": "timescale_percentages" },
+    "DURATION": { "display_name": "Duration", "tag_text": "Dur", "mod_type": "Direct", "scope": "Global", "properties": ["Timelimit"], "condition": None, "suffix": "s", "value_key": "durations" },
+    "HP": { "display_name": "HP", "tag_text": "HP", "mod_type": "Multiplier", "scope": "Character Profile", "properties": ["MaxHealth"], "condition": None, "suffix": "%", "value_key": "hp_percentages" },
+    "REGEN_RATE": { "display_name": "Regen", "tag_text": "Regen", "mod_type": "Calculated", "scope": "Character Profile", "properties": ["HealthRegenPerSec"], "calculation_base": "MaxHealth", "condition": None, "suffix": "%", "value_key": "regen_percentages" }
+}
+
+SETTINGS_FILE = "settings.json"
+SCENARIO_INDEX_FILE = os.path.join(os.path.dirname(SETTINGS_FILE), "scenario_index.json") # lives beside settings.json
+CATALOG_FILE = os.path.join(os.path.dirname(SETTINGS_FILE), "scenario_catalog.sqlite") # also beside settings.json
+GENERATION_WORKERS = min(8, (os.cpu_count() or 1) + 2) # file writes are I/O bound, a few extra threads help
+DEFAULT_KOVAAKS_PATH = r"C:\Program Files (x86)\Steam\steamapps\common\FPSAimTrainer\FPSAimTrainer\Saved\SaveGames\Scenarios"
+
+# Lookup tables derived once from MODIFIER_CONFIG so the parser doesn't rebuild them per line
+GLOBAL_PROPERTIES = {prop.lower(): prop for cfg in MODIFIER_CONFIG.values() if cfg['scope'] == 'Global' for prop in cfg['properties']}
+SCORE_PROPERTIES = {"scoreperhit": "ScorePerHit", "scoreperdamage": "ScorePerDamage", "scoreperkill": "ScorePerKill"}
+CHARACTER_PROPERTIES = {prop for cfg in MODIFIER_CONFIG.values() if cfg['scope'] == 'Character Profile' for prop in cfg['properties'] + ([cfg['calculation_base']] if cfg.get('calculation_base') else [])}
@@ -0,0 +1,56 @@
+# variant_core/folder_index.py - persistent index of the .sce files in a Scenarios folder
+#
+# scenario_index.json (beside settings.json) keeps, per folder, the folder's own mtime and
+# {scenario_name: [mtime, size]}. Adding, removing or renaming a file bumps the folder mtime, so
+# when it hasn't moved the stored names are reused without listing the folder at all.
+
+import json
+import os
+import time
+from .config import SCENARIO_INDEX_FILE
+
+INDEX_VERSION = 1
+# A folder mtime this close to "now" may still change within the filesystem's timestamp
+# resolution, so it isn't trusted as a "nothing changed" marker.
+MTIME_SETTLE_SECONDS = 2.0
+
+def load_scenario_index():
+    try:
+        with open(SCENARIO_INDEX_FILE, 'r', encoding='utf-8') as f: index_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError): index_data = {}
+    if index_data.get("version") != INDEX_VERSION: index_data = {"version": INDEX_VERSION, "folders": {}}
+    return index_data
+def save_scenario_index(index_data):
+    try:
+        with open(SCENARIO_INDEX_FILE, 'w', encoding='utf-8') as f: json.dump(index_data, f, separators=(',', ':'))
+    except Exception as e: print(f"Error saving scenario index: {e}")
+def _folder_key(folder): return os.path.normcase(os.path.abspath(folder))
+def _settled_mtime(path):
+    mtime = os.stat(path).st_mtime
+    return mtime if time.time() - mtime > MTIME_SETTLE_SECONDS else None
+def refresh_folder_index(index_data, folder):
+    # Returns {scenario_name: [mtime, size]} for the folder, rescanning only when the folder changed
+    folder_key = _folder_key(folder); folder_entry = index_data["folders"].get(folder_key)
+    dir_mtime = _settled_mtime(folder)
+    if folder_entry and dir_mtime is not None and folder_entry["dir_mtime"] == dir_mtime: return folder_entry["scenarios"]
+    scenarios = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(".sce"): continue
+            try: stat = entry.stat()
+            except OSError: continue
+            scenarios[entry.name[:-4]] = [stat.st_mtime, stat.st_size]
+    index_data["folders"][folder_key] = {"dir_mtime": dir_mtime, "scenarios": scenarios}
+    return scenarios
+def record_created_scenarios(index_data, folder, scenario_names):
+    # Updates the index in place with files we just wrote, instead of rescanning the whole folder
+    folder_key = _folder_key(folder); folder_entry = index_data["folders"].get(folder_key)
+    if folder_entry is None: return refresh_folder_index(index_data, folder)
+    scenarios = folder_entry["scenarios"]
+    for name in scenario_names:
+        try: stat = os.stat(os.path.join(folder, name + ".sce"))
+        except OSError: scenarios.pop(name, None); continue
+        scenarios[name] = [stat.st_mtime, stat.st_size]
+    # Our own writes moved the folder mtime; the index was in sync before the run, so it is again now
+    if folder_entry["dir_mtime"] is not None: folder_entry["dir_mtime"] = _settled_mtime(folder)
+    return scenarios
@@ -0,0 +1,121 @@
+# variant_core/mapped.py - memory-mapped scenario scanning and byte-splicing variant writes
+#
+# parse_scenario_file decodes the whole file into text. A variant only ever reads or rewrites a dozen keys
+# (Name, Timelimit, Timescale, ScorePer*, the bot size/speed/health values), so scan_scenario_file maps the
+# file and lets one bytes regex find just those lines and the section headers; only the matched values are
+# decoded. Variants are then written by splicing: the untouched byte ranges of the mapped source go to the
+# new file as memoryviews, with the new values in between. Apart from the changed values the output is the
+# source file byte for byte (its BOM, line endings and "Key = value" spacing included).
+#
+# Lines are split on "\n" (with or without "\r"); files using bare "\r" line breaks need parse_scenario_file.
+
+import mmap
+import os
+import re
+import time
+from .config import GLOBAL_PROPERTIES, SCORE_PROPERTIES, CHARACTER_PROPERTIES
+from .records import ProfileStats
+from .scenario import (INDEXED_GLOBAL_KEYS, INDEXED_PROFILE_KEYS, compile_variant_slots, apply_modifiers, format_slot_value, sort_modifiers, get_combined_variant_name,
+                       is_base_scenario_name)
+from .writer import write_chunks_atomic
+
+SCANNED_KEYS = sorted(INDEXED_GLOBAL_KEYS | INDEXED_PROFILE_KEYS | {"playercharacters"}, key=len, reverse=True)
+# A section header, or one of SCANNED_KEYS with its value; an optional BOM is allowed before the first line
+SCAN_PATTERN = re.compile(rb'^(?:\xef\xbb\xbf)?[ \t]*(?:(\[[^\r\n]*)|(' + b'|'.join(re.escape(key.encode()) for key in SCANNED_KEYS) + rb')[ \t]*=[ \t]*([^\r\n]*))',
+                          re.MULTILINE | re.IGNORECASE)
+
+def open_mapped(file_path):
+    # (file, buffer): an mmap of the file, or b"" for an empty one (which can't be mapped). Close the file when done.
+    f = open(file_path, 'rb')
+    try: return f, (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b"")
+    except BaseException: f.close(); raise
+def scan_scenario_file(file_path):
+    # The same values as parse_scenario_file, plus a section index whose positions are the (start, end) byte spans
+    # of the values, so compile_variant_slots works on it unchanged. Returns None when the file can't be read.
+    try:
+        f, data = open_mapped(file_path)
+        try:
+            stat = os.fstat(f.fileno()); scanned = _scan_buffer(data)
+        finally:
+            if isinstance(data, mmap.mmap): data.close()
+            f.close()
+    except (OSError, ValueError): return None
+    scanned["source"] = (file_path, stat.st_size, stat.st_mtime_ns)
+    return scanned
+def _scan_buffer(data):
+    extracted_data = { "scenario_name": "N/A", "player_profile_name": None, "character_profiles": {}, "global_properties": {} }
+    global_keys = {}; profile_keys = {}
+    in_any_section = False; in_char_profile_section = False; current_profile_name = None; current_profile_keys = None
+    for match in SCAN_PATTERN.finditer(data):
+        if match.start(1) >= 0:
+            in_any_section = True; in_char_profile_section = match.group(1).strip().lower() == b"[character profile]"; current_profile_name = None; current_profile_keys = None
+            continue
+        raw_value = match.group(3); value_start = match.start(3); value_end = value_start + len(raw_value.rstrip())
+        key = match.group(2).decode('ascii'); key_lower = key.lower(); value = raw_value.strip().decode('utf-8') # a bad byte raises ValueError -> None, like a failed decode in parse_scenario_file
+        span = (value_start, value_end)
+        if key_lower == "playercharacters": extracted_data["player_profile_name"] = value.split('.')[0]
+        if key_lower in SCORE_PROPERTIES: extracted_data['global_properties'][SCORE_PROPERTIES[key_lower]] = float(value)
+        if not in_any_section:
+            if key_lower in INDEXED_GLOBAL_KEYS: global_keys.setdefault(key_lower, []).append((span, key, value))
+            if key_lower == "name": extracted_data["scenario_name"] = value
+            elif key_lower in GLOBAL_PROPERTIES: extracted_data['global_properties'][GLOBAL_PROPERTIES[key_lower]] = float(value)
+        elif in_char_profile_section:
+            if key_lower == "name":
+                current_profile_name = value
+                extracted_data["character_profiles"].setdefault(current_profile_name, ProfileStats()); current_profile_keys = profile_keys.setdefault(current_profile_name, {})
+            if current_profile_name:
+                if key_lower in INDEXED_PROFILE_KEYS: current_profile_keys.setdefault(key_lower, []).append((span, key, value))
+                if key in CHARACTER_PROPERTIES: extracted_data["character_profiles"][current_profile_name][key] = float(value)
+    extracted_data["section_index"] = {"global_keys": global_keys, "profile_keys": profile_keys}
+    return extracted_data
+def get_splice_slots(scanned):
+    if "splice_slots" not in scanned: scanned["splice_slots"] = compile_variant_slots(scanned)
+    return scanned["splice_slots"]
+def get_variant_edits(scanned, modifiers, variant_configs, new_scenario_name=None):
+    # The splicing counterpart of render_combined_variant: (status, new_scenario_name, edits) with edits as
+    # sorted (start, end, new_bytes) replacements of value spans in the source file
+    modifiers = sort_modifiers(modifiers)
+    if new_scenario_name is None: new_scenario_name = get_combined_variant_name(scanned, modifiers, variant_configs)
+    applied = apply_modifiers(scanned, modifiers)
+    if applied is None: return "error_timelimit", new_scenario_name, None
+    global_values, profile_values, touched = applied
+    slots = get_splice_slots(scanned)
+    if not slots["name_found"]: return "name_not_found", new_scenario_name, None
+    edits = [(span[0], span[1], new_scenario_name.encode('utf-8')) for span, key, kind, source in slots["name_slots"]]
+    for mod_key in dict.fromkeys(mod_key for mod_key, new_value in modifiers):
+        edits.extend((span[0], span[1], format_slot_value(kind, source, global_values, profile_values).encode('ascii')) for span, key, kind, source in slots["slots"][mod_key] if source in touched)
+    return "success", new_scenario_name, sorted(set(edits)) # TIMESCALE and DURATION share the Timelimit/score slots
+def splice_file(source, dst_path, edits, writer=None):
+    # Writes the mapped source with the edits applied. source is scan_scenario_file's (path, size, mtime_ns); a source
+    # changed since the scan raises ValueError, since its spans no longer line up. Returns what the writer returns.
+    source_path, size, mtime_ns = source
+    f, data = open_mapped(source_path)
+    try:
+        stat = os.fstat(f.fileno())
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns): raise ValueError(f"'{source_path}' changed since it was scanned")
+        with memoryview(data) as view:
+            chunks = []; position = 0
+            for start, end, new_bytes in edits: chunks.append(view[position:start]); chunks.append(new_bytes); position = end
+            chunks.append(view[position:])
+            try: return writer.write_chunks(dst_path, chunks) if writer else write_chunks_atomic(dst_path, chunks, skip_unchanged=True)
+            finally:
+                for chunk in chunks:
+                    if isinstance(chunk, memoryview): chunk.release()
+    finally:
+        if isinstance(data, mmap.mmap): data.close()
+        f.close()
+def generate_spliced_variant(scanned, folder_path, modifiers, variant_configs, skip_existing=False, writer=None, metrics=None):
+    # generate_combined_variant for a scanned scenario; same statuses and return value
+    started = time.perf_counter(); modifiers = sort_modifiers(modifiers)
+    new_scenario_name = get_combined_variant_name(scanned, modifiers, variant_configs); named = time.perf_counter()
+    if skip_existing and os.path.exists(os.path.join(folder_path, new_scenario_name + ".sce")): return "skipped", new_scenario_name, None
+    status, new_scenario_name, edits = get_variant_edits(scanned, modifiers, variant_configs, new_scenario_name); rendered = time.perf_counter()
+    if status != "success": return status, new_scenario_name, None
+    if is_base_scenario_name(scanned, new_scenario_name): return "error", new_scenario_name, f"❌ Not creating '{new_scenario_name}.sce': it would replace the scenario it is made from."
+    new_filename = os.path.join(folder_path, new_scenario_name + ".sce"); error_message = None
+    try:
+        size = splice_file(scanned["source"], new_filename, edits, writer)
+        status = "success" if size is not None else "unchanged"
+    except Exception as e: status = "error"; error_message = f"❌ ERROR creating {new_filename}: {e}"
+    if metrics: metrics.add_variant(named - started, rendered - named, time.perf_counter() - rendered)
+    return status, new_scenario_name, error_message
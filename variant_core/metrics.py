@@ -0,0 +1,41 @@
+# variant_core/metrics.py - per-phase timing of generation runs
+#
+# One RunMetrics per run, shared by its workers. Phases are parse / name / transform / write / refresh; their
+# times are summed over all workers, so with several threads they can add up to more than the wall time.
+
+import datetime
+import json
+import threading
+import time
+
+PHASES = ("parse", "name", "transform", "write", "refresh")
+
+class RunMetrics:
+    def __init__(self, kind):
+        self.kind = kind; self.started = time.perf_counter(); self.phases = dict.fromkeys(PHASES, 0.0); self.variant_seconds = []; self._lock = threading.Lock()
+    def add(self, phase, seconds):
+        with self._lock: self.phases[phase] += seconds
+    def add_variant(self, name_seconds, transform_seconds, write_seconds):
+        with self._lock:
+            self.phases["name"] += name_seconds; self.phases["transform"] += transform_seconds; self.phases["write"] += write_seconds
+            self.variant_seconds.append(name_seconds + transform_seconds + write_seconds)
+    def timed(self, phase, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try: return fn(*args, **kwargs)
+        finally: self.add(phase, time.perf_counter() - started)
+    def finish(self, write_stats=None):
+        # write_stats: VariantWriter.finish() of the same run, for the file and byte counts
+        seconds = time.perf_counter() - self.started; write_stats = write_stats or {}; times = sorted(self.variant_seconds)
+        def percentile(fraction): return times[min(len(times) - 1, int(fraction * len(times)))] * 1000 if times else 0.0
+        return {"time": datetime.datetime.now().isoformat(timespec="seconds"), "kind": self.kind, "variants": len(times), "files": write_stats.get("files", 0),
+                "unchanged": write_stats.get("unchanged", 0), "bytes": write_stats.get("bytes", 0), "seconds": round(seconds, 4),
+                "files_per_sec": round(write_stats.get("files", 0) / seconds, 1) if seconds > 0 else 0.0,
+                "variant_ms_p50": round(percentile(0.5), 3), "variant_ms_p95": round(percentile(0.95), 3),
+                "phases_ms": {phase: round(phase_seconds * 1000, 1) for phase, phase_seconds in self.phases.items()}}
+def format_run_summary(summary):
+    phases = ", ".join(f"{phase} {ms:.0f}" for phase, ms in summary["phases_ms"].items() if ms)
+    return (f"Run: {summary['seconds']:.2f}s for {summary['variants']} variants - {summary['files']} files written ({summary['bytes'] / 1048576:.2f} MB, {summary['files_per_sec']:.0f} files/s), "
+            f"{summary['unchanged']} unchanged; per variant p50 {summary['variant_ms_p50']:.2f} ms, p95 {summary['variant_ms_p95']:.2f} ms; phases (ms): {phases or '-'}")
+def append_run_metrics(path, summary):
+    # One JSON object per line, so the file can be tailed / loaded with any JSONL reader
+    with open(path, 'a', encoding='utf-8') as f: f.write(json.dumps(summary, ensure_ascii=False) + "\n")
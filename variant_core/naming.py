@@ -0,0 +1,54 @@
+# variant_core/naming.py - variant tag / scenario name helpers
+
+import functools
+import re
+
+def get_variant_value(suffix, value):
+    if suffix == "s": return f"{value}s"
+    else: return f"{value}%"
+def get_variant_tag(tag_text, suffix, value): return f"{tag_text} {get_variant_value(suffix, value)}"
+@functools.lru_cache(maxsize=32)
+def get_tag_needles(current_tags):
+    # Compiled once per tag set (a tuple, so editing a tag just builds a new entry): the " <tag> " text to look for.
+    # The old per-tag pattern had \b on both sides of the tag, so tags that don't start and end with a word character never matched.
+    return tuple(f" {tag} " for tag in current_tags if re.match(r"\w", tag[:1]) and re.match(r"\w", tag[-1:]))
+def find_base_cut(full_name, current_tags):
+    # Cuts the name at the first " <tag> " of each tag in turn. A tag only counts if its text lies completely before
+    # the current cut, which is exactly what str.find's end bound checks - no regex needed.
+    cut = len(full_name)
+    for needle in get_tag_needles(tuple(current_tags)):
+        start = full_name.find(needle, 0, cut)
+        if start >= 0: cut = start
+    return cut
+def get_base_scenario_name(full_name, current_tags): return full_name[:find_base_cut(full_name, current_tags)].strip()
+class ScenarioName:
+    # A scenario name split once into its base and the ordered (tag_text, value_text) pairs after it, e.g.
+    # "Air Angelic Size 80% Dur 30s" -> "Air Angelic" + [("Size", "80%"), ("Dur", "30s")]. Variants are built by
+    # swapping or appending pairs, so every caller gets the same name without redoing any string surgery.
+    __slots__ = ("base", "tags")
+    def __init__(self, base, tags): self.base = base; self.tags = tags
+    @classmethod
+    def parse(cls, full_name, current_tags):
+        full_name = full_name.strip(); needles = get_tag_needles(tuple(current_tags)); cut = find_base_cut(full_name, current_tags)
+        tail = full_name[cut:]; starts = {}
+        for needle in needles:
+            start = tail.find(needle)
+            while start >= 0:
+                if len(needle) > len(starts.get(start, "")): starts[start] = needle # the longest tag wins where two start together
+                start = tail.find(needle, start + 1)
+        positions = sorted(starts); tags = []
+        for start, end in zip(positions, positions[1:] + [len(tail)]):
+            if start < len(tail): tags.append((starts[start].strip(), tail[start + len(starts[start]):end].strip()))
+        return cls(full_name[:cut].strip(), tags)
+    def with_tags(self, new_tags):
+        # Replaces the value of a tag that is already there, otherwise appends it
+        tags = list(self.tags)
+        for tag_text, value_text in new_tags:
+            for i, (existing_text, existing_value) in enumerate(tags):
+                if existing_text == tag_text: tags[i] = (tag_text, value_text); break
+            else: tags.append((tag_text, value_text))
+        return ScenarioName(self.base, tags)
+    def __str__(self): return " ".join([self.base] + [f"{tag_text} {value_text}".strip() for tag_text, value_text in self.tags]).strip()
+def apply_variant_tag(scenario_name, tag_text, suffix, value, current_tags):
+    # Replaces an existing tag of the same kind ("X Size 80%" -> "X Size 50%"), otherwise appends the new tag
+    return str(ScenarioName.parse(scenario_name, current_tags).with_tags([(tag_text, get_variant_value(suffix, value))]))
@@ -0,0 +1,62 @@
+# variant_core/plan.py - working out what a generation run will write before anything is written
+
+import csv
+import json
+import os
+from .scenario import (get_variant_name, is_base_scenario_name, sort_modifiers, get_combined_variant_name, apply_modifiers, get_variant_template, get_compiled_segments,
+                       format_slot_value)
+
+def snapshot_folder(folder_path):
+    # One directory listing for the whole run. Names are normcased, so the lookup is case-insensitive on Windows like the filesystem.
+    try: return {os.path.normcase(entry.name) for entry in os.scandir(folder_path)}
+    except OSError: return set()
+def scan_conflicts(base_data, folder_path, tasks, variant_configs):
+    # Returns [(modifiers, new_scenario_name)] for every task whose output file already exists. A variant named like
+    # its base scenario is left out: the writer refuses it anyway, so there is nothing to decide.
+    existing = snapshot_folder(folder_path); conflicts = []
+    for modifiers in tasks:
+        new_scenario_name = get_variant_name(base_data, modifiers, variant_configs)
+        if os.path.normcase(new_scenario_name + ".sce") in existing and not is_base_scenario_name(base_data, new_scenario_name): conflicts.append((modifiers, new_scenario_name))
+    return conflicts
+def get_variant_changes(base_data, modifiers, variant_configs):
+    # Everything a variant would change, without rendering or writing it: (status, new_scenario_name, changes)
+    # with changes as (section, key, old_value, new_value) - section is "" for the global keys, else the character profile
+    modifiers = sort_modifiers(modifiers); new_scenario_name = get_combined_variant_name(base_data, modifiers, variant_configs)
+    applied = apply_modifiers(base_data, modifiers)
+    if applied is None: return "error_timelimit", new_scenario_name, []
+    template = get_variant_template(base_data)
+    if not template["name_found"]: return "name_not_found", new_scenario_name, []
+    global_values, profile_values, touched = applied; changes = []
+    for key, kind, source, original_line in get_compiled_segments(base_data, template, tuple(dict.fromkeys(mod_key for mod_key, new_value in modifiers)))[1]:
+        old_value = original_line.split('=', 1)[1].strip()
+        if kind == "name": new_value = new_scenario_name
+        elif source in touched: new_value = format_slot_value(kind, source, global_values, profile_values)
+        else: continue
+        if new_value != old_value: changes.append((source[0] if kind == "profile" else "", key, old_value, new_value))
+    return "success", new_scenario_name, changes
+def iter_variant_plan(base_data, folder_path, tasks, variant_configs):
+    # Dry run: one plan entry (a plain dict, ready for JSON) per task, computed entirely in memory
+    existing = snapshot_folder(folder_path)
+    for modifiers in tasks:
+        status, new_scenario_name, changes = get_variant_changes(base_data, modifiers, variant_configs)
+        if status == "success" and is_base_scenario_name(base_data, new_scenario_name): status = "error"
+        yield {"scenario": base_data['user_provided_name'].strip(), "file": new_scenario_name + ".sce", "status": status, "exists": os.path.normcase(new_scenario_name + ".sce") in existing,
+               "modifiers": {mod_key: value for mod_key, value in modifiers}, "changes": [{"section": section, "key": key, "old": old_value, "new": new_value} for section, key, old_value, new_value in changes]}
+def format_plan_entry(entry):
+    changes = ", ".join(f"{change['section'] + '.' if change['section'] else ''}{change['key']} {change['old']} -> {change['new']}" for change in entry["changes"] if change["key"].lower() != "name")
+    flags = ("" if entry["status"] == "success" else f" [{entry['status']}]") + (" [exists]" if entry["exists"] else "")
+    return f"{entry['file']}{flags}: {changes}" if changes else f"{entry['file']}{flags}"
+PLAN_CSV_FIELDS = ["scenario", "file", "status", "exists", "section", "key", "old", "new"]
+def export_plan(entries, path):
+    # .csv gets one row per changed key (a variant without changes still gets one row), anything else is written as JSON
+    if path.lower().endswith(".csv"):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f); writer.writerow(PLAN_CSV_FIELDS); count = 0
+            for entry in entries:
+                head = [entry["scenario"], entry["file"], entry["status"], entry["exists"]]
+                for change in entry["changes"] or [{"section": "", "key": "", "old": "", "new": ""}]: writer.writerow(head + [change["section"], change["key"], change["old"], change["new"]])
+                count += 1
+        return count
+    entries = list(entries)
+    with open(path, 'w', encoding='utf-8') as f: json.dump({"version": 1, "variants": entries}, f, indent=2, ensure_ascii=False)
+    return len(entries)
@@ -0,0 +1,47 @@
+# variant_core/records.py - compact in-memory form of a parsed scenario
+#
+# A loaded scenario used to be a list with one str object per line plus a dict per character profile,
+# which costs several times the file size once hundreds of scenarios are held (batch runs, the cache).
+# Here the file stays one str and lines are (start, end) spans given by an array of offsets.
+
+import sys
+from array import array
+from itertools import accumulate
+from .config import CHARACTER_PROPERTIES
+
+class ScenarioLines:
+    # Read-only sequence of the file's lines (each with its "\n", like readlines()) over a single buffer
+    __slots__ = ("text", "offsets")
+    def __init__(self, text, parts=None):
+        # parts is text.split("\n") when the caller already has it
+        if parts is None: parts = text.split("\n")
+        offsets = array('I' if len(text) < 2 ** 32 else 'Q', [0]); offsets.extend(accumulate(len(part) + 1 for part in parts[:-1]))
+        if parts[-1]: offsets.append(len(text)) # last line without a trailing newline
+        self.text = text; self.offsets = offsets
+    def __len__(self): return len(self.offsets) - 1
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError("line index out of range")
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+    def __iter__(self): return (self.text[start:end] for start, end in zip(self.offsets, self.offsets[1:]))
+    def span(self, start, end):
+        # (first, last) character offsets of lines [start, end), for slicing the buffer later
+        return self.offsets[start], self.offsets[end]
+    def __sizeof__(self): return object.__sizeof__(self) + sys.getsizeof(self.text) + sys.getsizeof(self.offsets)
+class ProfileStats:
+    # The parsed numeric values of one character profile. Only the properties a modifier reads or writes
+    # are kept, as slots; it answers get/[]/items like the dict it replaces, and a slot never set is absent.
+    __slots__ = tuple(sorted(CHARACTER_PROPERTIES))
+    def get(self, prop, default=None): return getattr(self, prop, default) if prop in CHARACTER_PROPERTIES else default
+    def __getitem__(self, prop):
+        value = self.get(prop, self)
+        if value is self: raise KeyError(prop)
+        return value
+    def __setitem__(self, prop, value): setattr(self, prop, value)
+    def __contains__(self, prop): return self.get(prop, self) is not self
+    def keys(self): return [prop for prop in self.__slots__ if hasattr(self, prop)]
+    def items(self): return [(prop, getattr(self, prop)) for prop in self.keys()]
+    def __iter__(self): return iter(self.keys())
+    def __len__(self): return len(self.keys())
+    def __repr__(self): return f"ProfileStats({dict(self.items())})"
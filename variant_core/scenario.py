@@ -0,0 +1,197 @@
+# variant_core/scenario.py - .sce parsing and variant rendering/writing
+
+import os
+import time
+from .config import MODIFIER_CONFIG, GLOBAL_PROPERTIES, SCORE_PROPERTIES, CHARACTER_PROPERTIES
+from .naming import ScenarioName, get_variant_value
+from .writer import write_file_atomic
+from .records import ScenarioLines, ProfileStats
+
+INDEXED_GLOBAL_KEYS = {"name", "timelimit"} | set(GLOBAL_PROPERTIES) | set(SCORE_PROPERTIES)
+INDEXED_PROFILE_KEYS = {"name"} | {prop.lower() for prop in CHARACTER_PROPERTIES}
+def parse_scenario_file(file_path):
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig') as f: text = f.read()
+    except Exception: return None
+    # Single pass over the file. Besides the extracted values it records a section index
+    # (section boundaries + line numbers per key) that create_variant_file reuses instead of re-scanning.
+    # Index entries are (line_index, key_as_written, value) tuples, keyed by the lowercased key; only keys a
+    # modifier can rewrite are indexed. all_lines is a ScenarioLines view over the one text buffer.
+    parts = text.split("\n"); lines = ScenarioLines(text, parts); line_count = len(lines)
+    extracted_data = { "all_lines": lines, "scenario_name": "N/A", "player_profile_name": None, "character_profiles": {}, "global_properties": {} }
+    sections = []; global_keys = {}; profile_keys = {}
+    in_any_section = False; in_char_profile_section = False; current_profile_name = None; current_profile_keys = None
+    try:
+        for i, line in enumerate(parts):
+            line_strip = line.strip()
+            if line_strip.startswith('['):
+                if sections: sections[-1][2] = i
+                sections.append([line_strip.lower(), i, line_count])
+                in_any_section = True; in_char_profile_section = line_strip.lower() == "[character profile]"; current_profile_name = None; current_profile_keys = None
+                continue
+            if '=' not in line_strip: continue
+            key, value = line_strip.split('=', 1); key, value = key.strip(), value.strip(); key_lower = key.lower()
+            if key_lower == "playercharacters": extracted_data["player_profile_name"] = value.split('.')[0]
+            if key_lower in SCORE_PROPERTIES: extracted_data['global_properties'][SCORE_PROPERTIES[key_lower]] = float(value)
+            if not in_any_section:
+                if key_lower in INDEXED_GLOBAL_KEYS: global_keys.setdefault(key_lower, []).append((i, key, value))
+                if key_lower == "name": extracted_data["scenario_name"] = value
+                elif key_lower in GLOBAL_PROPERTIES: extracted_data['global_properties'][GLOBAL_PROPERTIES[key_lower]] = float(value)
+            elif in_char_profile_section:
+                if key_lower == "name":
+                    current_profile_name = value
+                    extracted_data["character_profiles"].setdefault(current_profile_name, ProfileStats()); current_profile_keys = profile_keys.setdefault(current_profile_name, {})
+                if current_profile_name:
+                    if key_lower in INDEXED_PROFILE_KEYS: current_profile_keys.setdefault(key_lower, []).append((i, key, value))
+                    if key in CHARACTER_PROPERTIES: extracted_data["character_profiles"][current_profile_name][key] = float(value)
+    except ValueError: return None # a non-numeric value (e.g. "Timescale=abc") makes the file as unusable as an unreadable one
+    extracted_data["section_index"] = {"sections": [tuple(s) for s in sections], "global_keys": global_keys, "profile_keys": profile_keys}
+    return extracted_data
+MODIFIER_ORDER = {mod_key: position for position, mod_key in enumerate(MODIFIER_CONFIG)}
+def compile_variant_template(base_data):
+    # Built once per loaded scenario. For every modifier it records which lines it can rewrite ("slots",
+    # each tied to the value it prints), and for each combination of modifiers in use the untouched text
+    # between those lines is pre-joined ("segments"). Producing a variant is then a handful of string
+    # formats plus one join instead of a scan over the whole file.
+    template = compile_variant_slots(base_data)
+    for mod_key in MODIFIER_CONFIG: get_compiled_segments(base_data, template, (mod_key,))
+    return template
+def compile_variant_slots(base_data):
+    # The slot half of the template. A slot's position is whatever the section index recorded for the key -
+    # a line number here, a byte span for the memory-mapped reader (see mapped.py).
+    index = base_data["section_index"]; global_keys = index["global_keys"]
+    internal_name = base_data['scenario_name'].strip().lower(); player_name = base_data.get("player_profile_name")
+    name_slots = [(i, key, "name", None) for i, key, value in global_keys.get("name", []) if value.lower() == internal_name]
+    timelimit_slots = [(i, key, "timelimit", "Timelimit") for i, key, value in global_keys.get("timelimit", [])]
+    score_slots = [(i, key, "score", prop) for key_lower, prop in SCORE_PROPERTIES.items() for i, key, value in global_keys.get(key_lower, [])]
+    slots = {}
+    for mod_key, config in MODIFIER_CONFIG.items():
+        if mod_key == "DURATION": slots[mod_key] = timelimit_slots + score_slots
+        elif mod_key == "TIMESCALE": slots[mod_key] = [(i, key, "global", prop) for prop in config['properties'] for i, key, value in global_keys.get(prop.lower(), [])] + timelimit_slots + score_slots
+        elif config['scope'] == 'Character Profile':
+            slots[mod_key] = [(i, key, "profile", (profile_name, prop)) for profile_name, keys in index["profile_keys"].items() if profile_name != player_name
+                              for prop in config['properties'] for i, key, value in keys.get(prop.lower(), [])]
+    return {"name_found": bool(name_slots), "name_slots": name_slots, "slots": slots, "combined": {}}
+def get_compiled_segments(base_data, template, mod_keys):
+    # mod_keys is a tuple in MODIFIER_CONFIG order; combinations are compiled on first use.
+    # Segments are (start, end) offsets into the file buffer, so a compiled combination costs a few ints, not a copy of the file.
+    if mod_keys not in template["combined"]:
+        lines = base_data["all_lines"]; slots_by_line = {slot[0]: slot for slot in template["name_slots"]}
+        for mod_key in mod_keys: slots_by_line.update((slot[0], slot) for slot in template["slots"][mod_key])
+        segments = []; prev = 0
+        for i in sorted(slots_by_line): segments.append(lines.span(prev, i)); prev = i + 1
+        segments.append(lines.span(prev, len(lines)))
+        template["combined"][mod_keys] = (tuple(segments), tuple((key, kind, source, lines[i]) for i, key, kind, source in (slots_by_line[i] for i in sorted(slots_by_line))))
+    return template["combined"][mod_keys]
+def get_variant_template(base_data):
+    if "variant_template" not in base_data: base_data["variant_template"] = compile_variant_template(base_data)
+    return base_data["variant_template"]
+def apply_modifiers(base_data, modifiers):
+    # Applies the modifiers one after another to the scenario's values, the same as generating each from the
+    # previous variant. Returns (global_values, profile_values, touched) or None when a duration variant is
+    # impossible (Timelimit=0). `touched` holds the values that were assigned; untouched lines stay verbatim.
+    global_values = dict(base_data['global_properties']); player_name = base_data.get("player_profile_name")
+    profile_values = {name: dict(props) for name, props in base_data["character_profiles"].items() if name != player_name}
+    touched = set()
+    for mod_key, new_value in modifiers:
+        config = MODIFIER_CONFIG[mod_key]; multiplier = new_value / 100.0
+        if mod_key == "DURATION":
+            base_timelimit = global_values.get("Timelimit", 0)
+            base_timescale = global_values.get("Timescale", 1.0)
+            if base_timelimit <= 0: return None
+            if base_timescale > 0 and base_timescale != 1.0:
+                base_perceived_duration = base_timelimit / base_timescale
+                score_ratio = base_perceived_duration / new_value if new_value > 0 else 1.0
+                duration_multiplier = new_value / base_perceived_duration if base_perceived_duration > 0 else 1.0
+                global_values["Timelimit"] = base_timelimit * duration_multiplier
+            else:
+                score_ratio = base_timelimit / new_value if new_value > 0 else 1.0
+                global_values["Timelimit"] = float(new_value)
+            touched.add("Timelimit")
+            # Score compensation only touches score keys whose base value is positive
+            for prop in SCORE_PROPERTIES.values():
+                if global_values.get(prop, 0) > 0: global_values[prop] *= score_ratio; touched.add(prop)
+        elif mod_key == "TIMESCALE":
+            for prop in config['properties']: global_values[prop] = global_values.get(prop, 1.0) * multiplier; touched.add(prop)
+            if global_values.get("Timelimit", 0) > 0: global_values["Timelimit"] *= multiplier; touched.add("Timelimit")
+            # --- FIX 1: Add score compensation for Timescale ---
+            if multiplier > 0: # Avoid division by zero
+                for prop in SCORE_PROPERTIES.values():
+                    if global_values.get(prop, 0) > 0: global_values[prop] /= multiplier; touched.add(prop)
+        elif config['scope'] == 'Character Profile':
+            for profile_name, props in profile_values.items():
+                for prop in config['properties']:
+                    if config['mod_type'] == 'Multiplier':
+                        base_val = props.get(prop, 0)
+                        if config['condition'] == "value > 0" and not base_val > 0: continue
+                        props[prop] = base_val * multiplier
+                    elif config['mod_type'] == 'Calculated': props[prop] = props.get(config['calculation_base'], 0) * multiplier
+                    touched.add((profile_name, prop))
+    return global_values, profile_values, touched
+def get_scenario_name_model(base_data, variant_configs):
+    # Parsed once per loaded scenario and tag set, then shared by the conflict scan and every writer
+    current_tags = tuple(cfg['tag_text'] for cfg in variant_configs.values()); cached = base_data.get("name_model")
+    if cached is None or cached[0] != current_tags or cached[1] != base_data['user_provided_name']:
+        cached = (current_tags, base_data['user_provided_name'], ScenarioName.parse(base_data['user_provided_name'], current_tags)); base_data["name_model"] = cached
+    return cached[2]
+def is_base_scenario_name(base_data, new_scenario_name):
+    # e.g. "Size 80%" applied to "X Size 80%" - writing it would replace the scenario the variant is made from
+    return os.path.normcase(new_scenario_name) == os.path.normcase(base_data['user_provided_name'].strip())
+def get_combined_variant_name(base_data, modifiers, variant_configs):
+    return str(get_scenario_name_model(base_data, variant_configs).with_tags([(variant_configs[mod_key]['tag_text'], get_variant_value(variant_configs[mod_key]['suffix'], new_value)) for mod_key, new_value in modifiers]))
+def sort_modifiers(modifiers): return sorted(((mod_key.upper(), new_value) for mod_key, new_value in modifiers), key=lambda modifier: MODIFIER_ORDER[modifier[0]])
+def get_variant_name(base_data, modifiers, variant_configs):
+    # The exact name generate_combined_variant will write, for modifiers in any order
+    return get_combined_variant_name(base_data, sort_modifiers(modifiers), variant_configs)
+def format_slot_value(kind, source, global_values, profile_values):
+    # The text a rewritten line gets after "Key=" (the precision each kind of value has always been written with)
+    if kind == "timelimit": return f"{global_values[source]:.1f}"
+    if kind == "score" or kind == "global": return f"{global_values[source]:.3f}"
+    return f"{profile_values[source[0]][source[1]]:.5f}"
+def render_combined_variant(base_data, modifiers, variant_configs, new_scenario_name=None):
+    # modifiers: iterable of (variant_type_key, value). Returns (status, new_scenario_name, file_text);
+    # does no I/O or UI so it is safe to run on worker threads. A name already worked out can be passed in.
+    modifiers = sort_modifiers(modifiers)
+    if new_scenario_name is None: new_scenario_name = get_combined_variant_name(base_data, modifiers, variant_configs)
+    applied = apply_modifiers(base_data, modifiers)
+    if applied is None: return "error_timelimit", new_scenario_name, None
+    global_values, profile_values, touched = applied
+    template = get_variant_template(base_data)
+    if not template["name_found"]: return "name_not_found", new_scenario_name, None
+    segments, slots = get_compiled_segments(base_data, template, tuple(dict.fromkeys(mod_key for mod_key, new_value in modifiers)))
+    text = base_data["all_lines"].text; start, end = segments[0]; parts = [text[start:end]]
+    for (key, kind, source, original_line), (start, end) in zip(slots, segments[1:]):
+        if kind == "name": parts.append(f"{key}={new_scenario_name}\n")
+        elif source not in touched: parts.append(original_line)
+        else: parts.append(f"{key}={format_slot_value(kind, source, global_values, profile_values)}\n")
+        parts.append(text[start:end])
+    return "success", new_scenario_name, "".join(parts)
+def render_variant(base_data, variant_type_key, new_value, variant_configs):
+    return render_combined_variant(base_data, [(variant_type_key, new_value)], variant_configs)
+def generate_combined_variant(base_data, folder_path, modifiers, variant_configs, skip_existing=False, writer=None, metrics=None):
+    # Render + write without touching the UI; returns (status, new_scenario_name, error_message).
+    # With a RunMetrics, the variant's name / transform / write times are recorded.
+    started = time.perf_counter(); modifiers = sort_modifiers(modifiers)
+    new_scenario_name = get_combined_variant_name(base_data, modifiers, variant_configs); named = time.perf_counter()
+    if skip_existing and os.path.exists(os.path.join(folder_path, new_scenario_name + ".sce")): return "skipped", new_scenario_name, None
+    status, new_scenario_name, text = render_combined_variant(base_data, modifiers, variant_configs, new_scenario_name); rendered = time.perf_counter()
+    if status != "success": return status, new_scenario_name, None
+    if is_base_scenario_name(base_data, new_scenario_name): return "error", new_scenario_name, f"❌ Not creating '{new_scenario_name}.sce': it would replace the scenario it is made from."
+    new_filename = os.path.join(folder_path, new_scenario_name + ".sce"); error_message = None
+    try:
+        size = writer.write(new_filename, text) if writer else write_file_atomic(new_filename, text, skip_unchanged=True)
+        status = "success" if size is not None else "unchanged"
+    except Exception as e: status = "error"; error_message = f"❌ ERROR creating {new_filename}: {e}"
+    if metrics: metrics.add_variant(named - started, rendered - named, time.perf_counter() - rendered)
+    return status, new_scenario_name, error_message
+def generate_variant(base_data, folder_path, variant_type_key, new_value, variant_configs):
+    return generate_combined_variant(base_data, folder_path, [(variant_type_key, new_value)], variant_configs)
+def create_variant_file(base_data, folder_path, variant_type_key, new_value, variant_configs):
+    status, new_scenario_name, error_message = generate_variant(base_data, folder_path, variant_type_key, new_value, variant_configs)
+    if status == "name_not_found":
+        print(f"❌ Could not find the name line in the file. Looking for: '{base_data['scenario_name'].strip()}'")
+    elif status == "success": print(f"✅ Created: {new_scenario_name}.sce")
+    elif status == "unchanged": print(f"⏩ Unchanged: {new_scenario_name}.sce")
+    elif status == "error": print(error_message)
+    return status
+
@@ -0,0 +1,49 @@
+# variant_core/scenario_cache.py - LRU cache of parsed scenarios
+#
+# Entries are keyed by (path, mtime, size), so an edited file is simply a miss. The bound is on the
+# approximate memory of the cached scenarios rather than on their count, since .sce files range from
+# a few KB to several MB.
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from .scenario import parse_scenario_file, get_variant_template
+
+SCENARIO_CACHE_MAX_MB = 64
+
+def estimate_scenario_size(base_data):
+    # The text buffer and its line offsets dominate; template segments are offsets into that buffer and the
+    # slots hold one original line each
+    template_size = sum(sys.getsizeof(slot[3]) for segments, slots in base_data.get("variant_template", {"combined": {}})["combined"].values() for slot in slots)
+    return sys.getsizeof(base_data["all_lines"]) + template_size
+class ScenarioCache:
+    def __init__(self, max_bytes=SCENARIO_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes; self.total_bytes = 0; self.hits = 0; self.misses = 0
+        self._entries = OrderedDict(); self._keys_by_path = {}; self._lock = threading.Lock()
+    def load(self, file_path):
+        # Returns a shallow copy so callers can set per-load fields (user_provided_name) without touching the cached entry
+        path = os.path.normcase(os.path.abspath(file_path))
+        try: stat = os.stat(path)
+        except OSError: return None
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key); self.hits += 1
+                return dict(self._entries[key][0])
+        base_data = parse_scenario_file(file_path)
+        if base_data is None: return None
+        get_variant_template(base_data) # compiled once here so every copy shares it
+        size = estimate_scenario_size(base_data)
+        with self._lock:
+            self.misses += 1
+            self._discard(self._keys_by_path.get(path))
+            self._entries[key] = (base_data, size); self._keys_by_path[path] = key; self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1: self._discard(next(iter(self._entries)))
+        return dict(base_data)
+    def _discard(self, key):
+        if key not in self._entries: return
+        base_data, size = self._entries.pop(key); self.total_bytes -= size
+        if self._keys_by_path.get(key[0]) == key: del self._keys_by_path[key[0]]
+    def clear(self):
+        with self._lock: self._entries.clear(); self._keys_by_path.clear(); self.total_bytes = 0
@@ -0,0 +1,45 @@
+# variant_core/search.py - incremental, ranked search over scenario names
+#
+# Matching is case-insensitive. Substring hits come first (prefix > word start > anywhere), then
+# "fuzzy" hits whose characters merely appear in order (e.g. "1w4s" -> "1wall 4targets small").
+# When the new query extends the previous one, only the previous hits are re-checked, so typing a
+# name narrows an ever smaller candidate list instead of rescanning the whole folder per keystroke.
+
+import re
+
+SEARCH_RESULT_LIMIT = 2000
+WORD_SEPARATORS = " _-."
+
+class ScenarioSearch:
+    def __init__(self, names):
+        self.names = list(names); self.lowered = [name.lower() for name in self.names]
+        self._query = None; self._substring_hits = None; self._fuzzy_hits = None
+    def _match(self, query):
+        if self._query is not None and query.startswith(self._query):
+            # Anything matching the longer query also matched the shorter one
+            substring_candidates = self._substring_hits; fuzzy_candidates = self._substring_hits + self._fuzzy_hits
+        else:
+            substring_candidates = fuzzy_candidates = range(len(self.names))
+        lowered = self.lowered
+        substring_hits = [i for i in substring_candidates if query in lowered[i]]
+        in_order = re.compile('.*?'.join(map(re.escape, query)))
+        substring_set = set(substring_hits)
+        fuzzy_hits = [i for i in fuzzy_candidates if i not in substring_set and in_order.search(lowered[i])]
+        fuzzy_hits.sort()
+        self._query, self._substring_hits, self._fuzzy_hits = query, substring_hits, fuzzy_hits
+        return substring_hits, fuzzy_hits, in_order
+    def search(self, query, limit=SEARCH_RESULT_LIMIT): # limit=None returns every match
+        query = query.lower()
+        if not query: self._query = None; return self.names[:limit]
+        substring_hits, fuzzy_hits, in_order = self._match(query)
+        lowered = self.lowered
+        def substring_rank(i):
+            position = lowered[i].find(query)
+            return (0 if position == 0 else 1 if lowered[i][position - 1] in WORD_SEPARATORS else 2, i)
+        results = [self.names[i] for i in sorted(substring_hits, key=substring_rank)[:limit]]
+        if (limit is None or len(results) < limit) and fuzzy_hits:
+            # Tighter matches (shorter span covering the query's characters) rank first
+            def fuzzy_rank(i):
+                found = in_order.search(lowered[i]); return (found.end() - found.start(), i)
+            results += [self.names[i] for i in sorted(fuzzy_hits, key=fuzzy_rank)[:None if limit is None else limit - len(results)]]
+        return results
@@ -0,0 +1,53 @@
+# variant_core/settings.py - settings.json profiles
+
+import json
+from .config import MODIFIER_CONFIG, SETTINGS_FILE, DEFAULT_KOVAAKS_PATH
+
+def get_default_profile():
+    profile = {
+        "folder_path": DEFAULT_KOVAAKS_PATH,
+        # --- FIX 2: Unique keys for each percentage list ---
+        "size_percentages": [50, 60, 70, 80, 90, 110, 120, 130, 140, 150, 200],
+        "speed_percentages": [50, 60, 70, 80, 90, 110, 120, 130, 140, 150, 200],
+        "timescale_percentages": [50, 60, 70, 80, 90, 110, 120, 130, 140, 150, 200],
+        "durations": [15, 30, 45, 60, 90, 120],
+        "hp_percentages": [20, 50, 80, 90, 110, 130, 150, 200, 300],
+        "regen_percentages": [10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
+        "checkboxes": {}, "variant_tags": {key: config['tag_text'] for key, config in MODIFIER_CONFIG.items()}
+    }
+    for key, config in MODIFIER_CONFIG.items():
+        value_list = profile[config['value_key']]
+        for i, value in enumerate(value_list):
+            is_checked = not (key in ["HP", "REGEN_RATE"] or (key == "DURATION" and value == 60))
+            profile["checkboxes"][f"{key}_{i}"] = is_checked
+    return profile
+def save_settings(settings_data):
+    try:
+        # Cleanup old/deprecated keys before saving
+        for profile in settings_data.get("profiles", {}).values():
+            if "legacy_timescale_mode" in profile: del profile["legacy_timescale_mode"]
+            if "percentages" in profile: del profile["percentages"] # Old shared key
+        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f: json.dump(settings_data, f, indent=4)
+        print("Settings saved.")
+    except Exception as e: print(f"Error saving settings: {e}")
+def load_settings():
+    try:
+        with open(SETTINGS_FILE, 'r') as f:
+            settings = json.load(f)
+            if "language" not in settings: settings["language"] = "EN"
+            if "profiles" in settings and "last_active_profile" in settings:
+                # --- FIX 2: Backwards compatibility for old settings files ---
+                for pname, profile in settings["profiles"].items():
+                    if "percentages" in profile and "size_percentages" not in profile:
+                        print(f"Migrating old settings for profile '{pname}'...")
+                        profile["size_percentages"] = profile.get("percentages", get_default_profile()["size_percentages"])
+                        profile["speed_percentages"] = profile.get("percentages", get_default_profile()["speed_percentages"])
+                        profile["timescale_percentages"] = profile.get("percentages", get_default_profile()["timescale_percentages"])
+                return settings
+            else:
+                print("Old or invalid settings file detected. Creating a fresh one.")
+                migrated_profile = get_default_profile()
+                if "folder_path" in settings: migrated_profile["folder_path"] = settings["folder_path"]
+                return {"language": "EN", "last_active_profile": "Default", "profiles": {"Default": migrated_profile}}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"language": "EN", "last_active_profile": "Default", "profiles": {"Default": get_default_profile()}}
@@ -0,0 +1,28 @@
+# variant_core/tasks.py - enumerating the variants a generation run will create
+
+import collections
+import itertools
+import math
+
+def iter_variant_tasks(selected_values, cross_product=False):
+    # selected_values: {variant_type_key: [values]} in MODIFIER_CONFIG order. Yields one tuple of
+    # (variant_type_key, value) pairs per output file. It is a generator, so even a large
+    # cross-product grid is never held in memory as a whole.
+    if not cross_product:
+        for mod_key, values in selected_values.items():
+            for value in values: yield ((mod_key, value),)
+        return
+    axes = [[(mod_key, value) for value in values] for mod_key, values in selected_values.items() if values]
+    if axes: yield from itertools.product(*axes)
+def count_variant_tasks(selected_values, cross_product=False):
+    counts = [len(values) for values in selected_values.values() if values]
+    if not counts: return 0
+    return math.prod(counts) if cross_product else sum(counts)
+def imap_bounded(executor, fn, iterable, max_in_flight):
+    # Like executor.map, but keeps at most max_in_flight tasks submitted so a lazy iterable stays lazy.
+    # Results come back in input order.
+    pending = collections.deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_in_flight: yield pending.popleft().result()
+    while pending: yield pending.popleft().result()
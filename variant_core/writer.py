@@ -0,0 +1,92 @@
+# variant_core/writer.py - atomic variant file output
+#
+# Each variant is encoded once and written to a temp file in the target folder (".~*.sce.tmp", which
+# neither KovaaK's nor the folder index picks up), then renamed over the final name. A crash mid-batch
+# therefore leaves either the old file or the complete new one, never half a scenario.
+
+import os
+import tempfile
+import threading
+import time
+
+FSYNC_POLICIES = ("none", "batch", "each")
+DEFAULT_FSYNC_POLICY = "batch"
+# mkstemp creates 0600 files; new variants get the mode a plain open() would give them instead.
+# Read once here - os.umask can only be read by setting it, which isn't safe once writer threads run.
+_UMASK = os.umask(0); os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+def file_has_content(path, data):
+    # Size first (one stat), then the bytes themselves - a direct compare is cheaper than hashing both sides.
+    # data is bytes or a list of bytes-like chunks (see write_chunks_atomic).
+    chunks = [data] if isinstance(data, bytes) else data
+    try:
+        if os.stat(path).st_size != sum(len(chunk) for chunk in chunks): return False
+        with open(path, 'rb') as f: existing = memoryview(f.read())
+        position = 0
+        for chunk in chunks:
+            if existing[position:position + len(chunk)] != chunk: return False
+            position += len(chunk)
+        return True
+    except OSError: return False
+def write_file_atomic(path, text, fsync=False, skip_unchanged=False):
+    # Returns the number of bytes written, or None when skip_unchanged found identical content already there
+    # (the file is left alone so its mtime doesn't change and sync tools don't re-upload it)
+    # Same bytes as open(path, 'w', encoding='utf-8') would produce, including the platform's newlines
+    if os.linesep != "\n": text = text.replace("\n", os.linesep)
+    return write_chunks_atomic(path, [text.encode('utf-8')], fsync, skip_unchanged)
+def write_chunks_atomic(path, chunks, fsync=False, skip_unchanged=False):
+    # The bytes-level half: chunks are written back to back as given, so memoryviews into a mapped source
+    # file go straight to the new file without being joined first
+    if skip_unchanged and file_has_content(path, chunks): return None
+    fd, temp_path = tempfile.mkstemp(prefix=".~", suffix=".sce.tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(chunks)
+            if fsync: f.flush(); os.fsync(f.fileno())
+        try: mode = os.stat(path).st_mode & 0o7777 # an overwritten file keeps its permissions
+        except OSError: mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try: os.unlink(temp_path)
+        except OSError: pass
+        raise
+    return sum(len(chunk) for chunk in chunks)
+def _fsync_file(path):
+    # Opened for writing: on Windows os.fsync is FlushFileBuffers, which fails with EBADF on a read-only handle
+    fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try: os.fsync(fd)
+    finally: os.close(fd)
+def _fsync_directory(path):
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        try: os.fsync(fd)
+        finally: os.close(fd)
+    except OSError: pass # directories can't be opened/fsynced on Windows; the rename is already durable there
+class VariantWriter:
+    # Shared by all workers of one run: writes atomically, applies the fsync policy and keeps throughput numbers.
+    # "each" fsyncs every file before its rename, "batch" fsyncs everything once in finish(), "none" leaves it to the OS.
+    def __init__(self, fsync_policy=DEFAULT_FSYNC_POLICY, skip_unchanged=True):
+        self.fsync_policy = fsync_policy if fsync_policy in FSYNC_POLICIES else DEFAULT_FSYNC_POLICY; self.skip_unchanged = skip_unchanged
+        self.files = 0; self.unchanged = 0; self.bytes = 0; self.started = time.perf_counter(); self._written = []; self._lock = threading.Lock()
+    def write(self, path, text):
+        return self._record(path, write_file_atomic(path, text, fsync=self.fsync_policy == "each", skip_unchanged=self.skip_unchanged))
+    def write_chunks(self, path, chunks):
+        return self._record(path, write_chunks_atomic(path, chunks, fsync=self.fsync_policy == "each", skip_unchanged=self.skip_unchanged))
+    def _record(self, path, size):
+        with self._lock:
+            if size is None: self.unchanged += 1; return None
+            self.files += 1; self.bytes += size
+            if self.fsync_policy == "batch": self._written.append(path)
+        return size
+    def finish(self):
+        fsync_errors = 0
+        if self._written:
+            for path in self._written:
+                try: _fsync_file(path)
+                except OSError as e: fsync_errors += 1; print(f"❌ Could not flush {path} to disk: {e}")
+            for directory in {os.path.dirname(os.path.abspath(path)) for path in self._written}: _fsync_directory(directory)
+            self._written = []
+        seconds = time.perf_counter() - self.started
+        return {"files": self.files, "unchanged": self.unchanged, "bytes": self.bytes, "fsync_errors": fsync_errors, "seconds": seconds, "files_per_sec": self.files / seconds if seconds > 0 else 0.0, "mb_per_sec": self.bytes / 1048576 / seconds if seconds > 0 else 0.0}